@@ -0,0 +1,217 @@
+"""
+非同期データベースアダプター
+psycopg の非同期接続と AsyncConnectionPool を使い、DatabaseAdapter と同じメソッドを
+コルーチンとして提供する。FastAPIのルートからイベントループを止めずにDBへアクセスするために使う
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from adapters.db_adapter import (
+    db_adapter,
+    build_article_insert,
+    build_field_update,
+    build_articles_by_ids_query,
+    order_by_ids,
+    pool_stats,
+    SELECT_ALL_ARTICLE_URLS_SQL,
+    SELECT_EXISTING_ARTICLE_URLS_SQL,
+    SELECT_ARTICLES_WITHOUT_SUMMARY_SQL,
+    SELECT_ARTICLES_FOR_DUPLICATE_INDEX_SQL,
+    SELECT_ARTICLE_BY_ID_SQL,
+    UPDATE_ARTICLE_SUMMARY_AND_LABELS_SQL,
+    UPDATE_ARTICLE_SUMMARY_SQL,
+    SELECT_LATEST_ARTICLES_SQL,
+    INSERT_TOPIC_SQL,
+    INSERT_TOPICS_ARTICLE_SQL,
+    SELECT_TOPIC_BY_ID_SQL,
+    SELECT_ARTICLES_BY_TOPIC_ID_SQL,
+)
+from entities.article import Article
+from entities.topic import Topic
+
+
+class AsyncDatabaseAdapter:
+    """非同期DBアクセス用アダプター（接続設定は DatabaseAdapter と共通、プールは別に確保）"""
+
+    def __init__(self):
+        self.config = db_adapter
+        self._pool: Optional[AsyncConnectionPool] = None
+        self._pool_lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        """
+        コネクションプールを開く
+
+        同期版と同様に、起動時は最小接続数の確立を待たない。
+        """
+        async with self._pool_lock:
+            if self._pool is not None:
+                return
+            config = self.config
+            self._pool = AsyncConnectionPool(
+                config.conninfo(),
+                kwargs={"autocommit": True, "row_factory": dict_row},
+                min_size=config.async_pool_min_size,
+                max_size=max(config.async_pool_min_size, config.async_pool_max_size),
+                timeout=config.pool_timeout,
+                max_idle=config.pool_max_idle,
+                check=AsyncConnectionPool.check_connection,
+                name="pipeline-async",
+                open=False
+            )
+            await self._pool.open(wait=False)
+            print(f"[INFO] Async database pool opened (min={config.async_pool_min_size}, max={config.async_pool_max_size})")
+
+    async def close(self) -> None:
+        """コネクションプールを閉じる"""
+        async with self._pool_lock:
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
+
+    async def get_connection(self):
+        """プールからDB接続を借りる（async with を抜けるとプールへ返却）"""
+        if self._pool is None:
+            await self.open()
+        return self._pool.connection()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プールの接続数・待ち時間の統計を取得"""
+        if self._pool is None:
+            return {"open": False}
+        return pool_stats(self._pool, self._pool.get_stats())
+
+    async def _fetchall(self, query: str, params=None) -> List[dict]:
+        async with await self.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
+                return await cur.fetchall()
+
+    async def _fetchone(self, query: str, params=None) -> Optional[dict]:
+        async with await self.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
+                return await cur.fetchone()
+
+    async def _execute(self, query: str, params=None) -> None:
+        async with await self.get_connection() as conn:
+            await conn.execute(query, params)
+
+    async def save_articles(self, articles: List[Article]) -> dict:
+        """
+        記事をデータベースに一括保存（ON CONFLICT DO NOTHING で重複をスキップ）
+
+        集計結果の形式・接続エラー時の挙動は DatabaseAdapter.save_articles と同じ。
+        """
+        rows = [art for art in articles if art.title and art.url]
+        chunk_size = self.config.insert_chunk_size
+        inserted = 0
+        failed = 0
+        async with await self.get_connection() as conn:
+            async with conn.cursor() as cur:
+                for offset in range(0, len(rows), chunk_size):
+                    chunk_inserted, chunk_failed = await self._insert_articles(cur, rows[offset:offset + chunk_size])
+                    inserted += chunk_inserted
+                    failed += chunk_failed
+
+        return {
+            "inserted": inserted,
+            "skipped": len(rows) - inserted - failed,
+            "invalid": len(articles) - len(rows),
+            "failed": failed,
+        }
+
+    async def _insert_articles(self, cur, articles: List[Article]) -> Tuple[int, int]:
+        """記事を1文で挿入し (挿入件数, 失敗件数) を返す（失敗時は半分に分割して再試行、接続エラーは送出）"""
+        try:
+            await cur.execute(*build_article_insert(articles))
+            return len(await cur.fetchall()), 0
+        except psycopg.OperationalError:
+            raise
+        except Exception as e:
+            if len(articles) == 1:
+                print(f"[ERROR] save_articles: {e} (title={articles[0].title})")
+                return 0, 1
+            middle = len(articles) // 2
+            first = await self._insert_articles(cur, articles[:middle])
+            second = await self._insert_articles(cur, articles[middle:])
+            return first[0] + second[0], first[1] + second[1]
+
+    async def get_all_article_urls(self) -> List[str]:
+        """登録済みの全記事URLを取得"""
+        rows = await self._fetchall(SELECT_ALL_ARTICLE_URLS_SQL)
+        return [row["articleUrl"] for row in rows]
+
+    async def find_existing_article_urls(self, urls: List[str]) -> List[str]:
+        """指定URLのうち登録済みのものを取得"""
+        if not urls:
+            return []
+        rows = await self._fetchall(SELECT_EXISTING_ARTICLE_URLS_SQL, (list(urls),))
+        return [row["articleUrl"] for row in rows]
+
+    async def get_articles_without_summary(self, limit: int = 100) -> List[dict]:
+        """要約されていない記事を取得"""
+        return await self._fetchall(SELECT_ARTICLES_WITHOUT_SUMMARY_SQL, (limit,))
+
+    async def get_articles_for_duplicate_index(self, limit: int = 5000) -> List[dict]:
+        """近似重複インデックス用に本文のある最新記事を取得"""
+        return await self._fetchall(SELECT_ARTICLES_FOR_DUPLICATE_INDEX_SQL, (limit,))
+
+    async def get_article_by_id(self, article_id: str) -> Optional[dict]:
+        """指定されたIDの記事を取得"""
+        return await self._fetchone(SELECT_ARTICLE_BY_ID_SQL, (article_id,))
+
+    async def get_articles_by_ids(self, article_ids: List[str], columns: Optional[List[str]] = None) -> Tuple[List[dict], List[str]]:
+        """指定IDの記事を1回のクエリで取得（指定順の記事リストと見つからなかったIDを返す）"""
+        if not article_ids:
+            return [], []
+        rows = await self._fetchall(
+            build_articles_by_ids_query(columns),
+            (list(dict.fromkeys(str(article_id) for article_id in article_ids)),)
+        )
+        return order_by_ids(article_ids, rows)
+
+    async def update_article_summary_and_labels(self, article_id: str, summary: str, labels: List[str]) -> None:
+        """記事の要約とラベルを更新"""
+        await self._execute(UPDATE_ARTICLE_SUMMARY_AND_LABELS_SQL, (summary, labels, article_id))
+
+    async def update_article_summary(self, article_id: str, summary: str) -> None:
+        """記事の要約のみを更新"""
+        await self._execute(UPDATE_ARTICLE_SUMMARY_SQL, (summary, article_id))
+
+    async def update_article_field(self, article_id: str, field_name: str, value) -> None:
+        """記事の特定フィールドを更新"""
+        await self._execute(build_field_update(field_name), (value, article_id))
+
+    async def get_latest_articles(self, limit: int = 10) -> List[dict]:
+        """最新記事を取得"""
+        return await self._fetchall(SELECT_LATEST_ARTICLES_SQL, (limit,))
+
+    async def save_topic(self, topic: Topic) -> str:
+        """TOPICSを保存"""
+        async with await self.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(INSERT_TOPIC_SQL, (topic.title, topic.content, topic.published_date))
+                topic_id = (await cur.fetchone())["id"]
+
+                # 記事とTOPICSの関連を保存
+                for article_id in topic.article_ids:
+                    await cur.execute(INSERT_TOPICS_ARTICLE_SQL, (topic_id, article_id))
+
+                return str(topic_id)
+
+    async def get_topic_by_id(self, topic_id: str) -> Optional[dict]:
+        """TOPICS詳細を取得"""
+        return await self._fetchone(SELECT_TOPIC_BY_ID_SQL, (topic_id,))
+
+    async def get_articles_by_topic_id(self, topic_id: str) -> List[dict]:
+        """TOPICS に紐づく記事を取得"""
+        return await self._fetchall(SELECT_ARTICLES_BY_TOPIC_ID_SQL, (topic_id,))
+
+
+# グローバルインスタンス
+async_db_adapter = AsyncDatabaseAdapter()
@@ -0,0 +1,34 @@
+"""
+同時実行数リミッター
+全体の同時実行数とホスト単位の同時実行数をセマフォで制限する
+"""
+import asyncio
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostConcurrencyLimiter:
+    """全体・ホスト単位の同時実行数を制限するリミッター"""
+
+    def __init__(self, total: int, per_host: int):
+        self.total = max(1, total)
+        self.per_host = max(1, per_host)
+        self._total_semaphore = asyncio.Semaphore(self.total)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).hostname or ""
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        """URLのホスト単位の実行枠"""
+        return self._host_semaphore(url)
+
+    def total_slot(self) -> asyncio.Semaphore:
+        """全体の実行枠"""
+        return self._total_semaphore
+
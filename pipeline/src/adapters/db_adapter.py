@@ -1,7 +1,10 @@
 import os
+import threading
 import psycopg
+from psycopg.conninfo import make_conninfo
 from psycopg.rows import dict_row
-from typing import List, Optional
+from psycopg_pool import ConnectionPool
+from typing import Any, Dict, List, Optional, Tuple
 import json
 from datetime import datetime
 
@@ -9,197 +12,434 @@ from entities.article import Article
 from entities.topic import Topic
 
 
+# 同期・非同期アダプターで共有するSQL
+SELECT_ALL_ARTICLE_URLS_SQL = "SELECT \"articleUrl\" FROM \"Article\""
+
+SELECT_EXISTING_ARTICLE_URLS_SQL = "SELECT \"articleUrl\" FROM \"Article\" WHERE \"articleUrl\" = ANY(%s)"
+
+SELECT_ARTICLES_WITHOUT_SUMMARY_SQL = """
+    SELECT id, title, "articleUrl" as url, source, "fullText" as content, "publishedAt" as published
+    FROM "Article"
+    WHERE summary IS NULL OR summary = ''
+    ORDER BY "publishedAt" DESC
+    LIMIT %s
+"""
+
+SELECT_ARTICLES_FOR_DUPLICATE_INDEX_SQL = """
+    SELECT id, "fullText" as content, summary, labels
+    FROM "Article"
+    WHERE "fullText" IS NOT NULL AND "fullText" <> ''
+    ORDER BY "publishedAt" DESC
+    LIMIT %s
+"""
+
+SELECT_ARTICLE_BY_ID_SQL = """
+    SELECT id, title, "articleUrl" as url, source, summary, labels, "thumbnailUrl" as thumbnail_url, "publishedAt" as published, "fullText" as content
+    FROM "Article"
+    WHERE id = %s
+"""
+
+UPDATE_ARTICLE_SUMMARY_AND_LABELS_SQL = "UPDATE \"Article\" SET summary=%s, labels=%s WHERE id=%s"
+
+UPDATE_ARTICLE_SUMMARY_SQL = "UPDATE \"Article\" SET summary=%s WHERE id=%s"
+
+SELECT_LATEST_ARTICLES_SQL = """
+    SELECT id, title, "articleUrl" as url, source, summary, labels, "thumbnailUrl" as thumbnail_url, "publishedAt" as published, "fullText" as content
+    FROM "Article"
+    ORDER BY "publishedAt" DESC NULLS LAST, "createdAt" DESC
+    LIMIT %s
+"""
+
+INSERT_TOPIC_SQL = """
+    INSERT INTO "Topic" (title, content, "publishDate")
+    VALUES (%s, %s, %s)
+    RETURNING id
+"""
+
+INSERT_TOPICS_ARTICLE_SQL = """
+    INSERT INTO "TopicsArticle" ("topicId", "articleId")
+    VALUES (%s, %s)
+"""
+
+SELECT_TOPIC_BY_ID_SQL = """
+    SELECT id, title, content, "publishDate", "createdAt"
+    FROM "Topic"
+    WHERE id = %s
+"""
+
+SELECT_ARTICLES_BY_TOPIC_ID_SQL = """
+    SELECT a.id, a.title, a."articleUrl" as url, a.source, a.summary, a.labels, a."thumbnailUrl" as thumbnail_url, a."publishedAt" as published, a."fullText" as content
+    FROM "TopicsArticle" ta
+    JOIN "Article" a ON ta."articleId" = a.id
+    WHERE ta."topicId" = %s
+    ORDER BY a."publishedAt" DESC NULLS LAST, a."createdAt" DESC
+"""
+
+# get_articles_by_ids で取得できる列（キー: 結果の列名、値: SELECT式）
+ARTICLE_COLUMNS = {
+    "id": 'id',
+    "title": 'title',
+    "url": '"articleUrl" as url',
+    "source": 'source',
+    "summary": 'summary',
+    "labels": 'labels',
+    "thumbnail_url": '"thumbnailUrl" as thumbnail_url',
+    "published": '"publishedAt" as published',
+    "content": '"fullText" as content',
+}
+
+# update_article_field で更新を許可するフィールド
+ALLOWED_UPDATE_FIELDS = ["summary", "labels", "categories", "thumbnailUrl"]
+
+# 一括更新時に VALUES の値へ付ける型
+ARTICLE_FIELD_TYPES = {
+    "summary": "text",
+    "labels": "text[]",
+    "categories": "text[]",
+    "thumbnailUrl": "text",
+}
+
+
+def build_article_insert(articles: List[Article]) -> Tuple[str, list]:
+    """
+    記事の複数行INSERT文とパラメータを作成
+
+    "articleUrl" の一意インデックスに対する ON CONFLICT DO NOTHING で重複を除外し、
+    RETURNING で実際に挿入された行だけを返す。
+    """
+    placeholders = ", ".join(
+        ["(gen_random_uuid(), %s, %s, %s, %s, %s, %s, %s, %s, NOW())"] * len(articles)
+    )
+    params = []
+    for art in articles:
+        params.extend((
+            art.title,
+            art.url,
+            art.source,
+            art.summary,
+            art.labels if art.labels else [],
+            art.thumbnail_url or "",
+            art.published,
+            art.content
+        ))
+    query = f"""
+        INSERT INTO "Article" (id, title, "articleUrl", source, summary, labels, "thumbnailUrl", "publishedAt", "fullText", "updatedAt")
+        VALUES {placeholders}
+        ON CONFLICT ("articleUrl") DO NOTHING
+        RETURNING "articleUrl"
+    """
+    return query, params
+
+
+def build_articles_by_ids_query(columns: Optional[List[str]] = None) -> str:
+    """ID一覧で記事を1回で取得するSELECT文を作成（id列は常に含める）"""
+    names = ["id"] + [name for name in (columns or ARTICLE_COLUMNS) if name != "id"]
+    unknown = [name for name in names if name not in ARTICLE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown article columns: {unknown}")
+    select = ", ".join(ARTICLE_COLUMNS[name] for name in names)
+    return f"SELECT {select} FROM \"Article\" WHERE id = ANY(%s)"
+
+
+def order_by_ids(article_ids: List[str], rows: List[dict]) -> Tuple[List[dict], List[str]]:
+    """取得結果を指定IDの順に並べ、見つからなかったIDを返す（重複IDは1件にまとめる）"""
+    by_id = {str(row["id"]): row for row in rows}
+    articles, missing = [], []
+    for article_id in dict.fromkeys(str(article_id) for article_id in article_ids):
+        row = by_id.get(article_id)
+        if row is None:
+            missing.append(article_id)
+        else:
+            articles.append(row)
+    return articles, missing
+
+
+def build_field_update(field_name: str) -> str:
+    """記事の特定フィールドのUPDATE文を作成"""
+    # フィールド名のサニタイゼーション（SQLインジェクション対策）
+    if field_name not in ALLOWED_UPDATE_FIELDS:
+        raise ValueError(f"Field '{field_name}' is not allowed for update")
+
+    # PostgreSQLのフィールド名を適切にクォート
+    quoted_field = f'"{field_name}"'
+    return f"UPDATE \"Article\" SET {quoted_field}=%s WHERE id=%s"
+
+
+def build_bulk_update(field_names: List[str], count: int) -> str:
+    """
+    複数記事の同じフィールドを1文で更新する UPDATE ... FROM (VALUES ...) 文を作成
+
+    VALUES の各行は (id, フィールド1, フィールド2, ...) の順。
+    """
+    for field_name in field_names:
+        if field_name not in ALLOWED_UPDATE_FIELDS:
+            raise ValueError(f"Field '{field_name}' is not allowed for update")
+    row = "(" + ", ".join(["%s::text"] + [f"%s::{ARTICLE_FIELD_TYPES[name]}" for name in field_names]) + ")"
+    columns = ", ".join(["id"] + [f'"{name}"' for name in field_names])
+    assignments = ", ".join(f'"{name}" = v."{name}"' for name in field_names)
+    return f"""
+        UPDATE "Article" AS a SET {assignments}
+        FROM (VALUES {", ".join([row] * count)}) AS v({columns})
+        WHERE a.id = v.id
+    """
+
+
+def pool_stats(pool, stats: Dict[str, int]) -> Dict[str, Any]:
+    """psycopg_pool の統計を共通の形式に整形"""
+    requests = stats.get("requests_num", 0)
+    return {
+        "open": True,
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "pool_size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "queued": stats.get("requests_queued", 0),
+        "timeouts": stats.get("requests_errors", 0),
+        "wait_ms_total": stats.get("requests_wait_ms", 0),
+        "wait_ms_avg": round(stats.get("requests_wait_ms", 0) / requests, 3) if requests else 0.0,
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
 class DatabaseAdapter:
     """データベースアクセス用アダプター（Prisma経由のDBアクセス）"""
-    
+
     def __init__(self):
         self.host = os.environ.get("POSTGRES_HOST", "localhost")
         self.dbname = os.environ.get("POSTGRES_DB", "semicon_topics")
         self.user = os.environ.get("POSTGRES_USER", "semicon_topics")
         self.password = os.environ.get("POSTGRES_PASSWORD", "semiconpass")
-    
+        # コネクションプール設定
+        self.pool_min_size = int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "1"))
+        self.pool_max_size = int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "10"))
+        # AsyncDatabaseAdapter のプールは別に確保するため、プロセスの最大接続数は両プールの合計になる
+        # （PostgreSQL の max_connections を超えないよう合計で見積もる）
+        self.async_pool_min_size = int(os.environ.get("POSTGRES_ASYNC_POOL_MIN_SIZE", str(self.pool_min_size)))
+        self.async_pool_max_size = int(os.environ.get("POSTGRES_ASYNC_POOL_MAX_SIZE", str(self.pool_max_size)))
+        # 接続の空き待ちの上限（秒）
+        self.pool_timeout = float(os.environ.get("POSTGRES_POOL_TIMEOUT", "30"))
+        # 最小数を超えた接続を閉じるまでのアイドル時間（秒）
+        self.pool_max_idle = float(os.environ.get("POSTGRES_POOL_MAX_IDLE", "300"))
+        # save_articles の1文あたりの挿入行数
+        self.insert_chunk_size = int(os.environ.get("SAVE_ARTICLES_CHUNK_SIZE", "500"))
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
+
+    def conninfo(self) -> str:
+        """接続文字列"""
+        return make_conninfo(host=self.host, dbname=self.dbname, user=self.user, password=self.password)
+
+    def open(self) -> None:
+        """
+        コネクションプールを開く
+
+        起動時にDBが未起動でも失敗しないよう、最小接続数の確立は待たない。
+        貸し出し時に接続を検査し、切断済みの接続は破棄して張り直す。
+        """
+        with self._pool_lock:
+            if self._pool is not None:
+                return
+            self._pool = ConnectionPool(
+                self.conninfo(),
+                kwargs={"autocommit": True, "row_factory": dict_row},
+                min_size=self.pool_min_size,
+                max_size=max(self.pool_min_size, self.pool_max_size),
+                timeout=self.pool_timeout,
+                max_idle=self.pool_max_idle,
+                check=ConnectionPool.check_connection,
+                name="pipeline",
+                open=False
+            )
+            self._pool.open(wait=False)
+            print(f"[INFO] Database pool opened (min={self.pool_min_size}, max={self.pool_max_size})")
+
+    def close(self) -> None:
+        """コネクションプールを閉じる"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
     def get_connection(self):
-        """DB接続を取得"""
-        return psycopg.connect(
-            host=self.host,
-            dbname=self.dbname,
-            user=self.user,
-            password=self.password,
-            autocommit=True,
-            row_factory=dict_row
-        )
-    
+        """プールからDB接続を借りる（with を抜けるとプールへ返却）"""
+        if self._pool is None:
+            # lifespan外（スクリプト等）から呼ばれた場合は初回利用時に開く
+            self.open()
+        return self._pool.connection()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プールの接続数・待ち時間の統計を取得"""
+        if self._pool is None:
+            return {"open": False}
+        return pool_stats(self._pool, self._pool.get_stats())
+
     def save_articles(self, articles: List[Article]) -> dict:
-        """記事をデータベースに保存"""
-        inserted, skipped = 0, 0
+        """
+        記事をデータベースに一括保存
+
+        複数行INSERTを "articleUrl" の一意インデックスに対する ON CONFLICT DO NOTHING で実行し、
+        RETURNING で返った行数を挿入件数、重複で挿入されなかった行数をスキップ件数とする。
+        タイトル・URLのない記事は invalid、挿入エラーになった記事は failed として別に数える。
+        DBに接続できない場合（psycopg.OperationalError）は途中まで挿入していても例外を送出する。
+        """
+        rows = [art for art in articles if art.title and art.url]
+        inserted = 0
+        failed = 0
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                for offset in range(0, len(rows), self.insert_chunk_size):
+                    chunk_inserted, chunk_failed = self._insert_articles(cur, rows[offset:offset + self.insert_chunk_size])
+                    inserted += chunk_inserted
+                    failed += chunk_failed
+
+        return {
+            "inserted": inserted,
+            "skipped": len(rows) - inserted - failed,
+            "invalid": len(articles) - len(rows),
+            "failed": failed,
+        }
+
+    def _insert_articles(self, cur, articles: List[Article]) -> Tuple[int, int]:
+        """
+        記事を1文で挿入し (挿入件数, 失敗件数) を返す
+
+        失敗時は半分に分割して再試行し、不正な行だけを除外する。接続エラーは分割せずに送出する。
+        """
+        try:
+            cur.execute(*build_article_insert(articles))
+            return len(cur.fetchall()), 0
+        except psycopg.OperationalError:
+            raise
+        except Exception as e:
+            if len(articles) == 1:
+                print(f"[ERROR] save_articles: {e} (title={articles[0].title})")
+                return 0, 1
+            middle = len(articles) // 2
+            first = self._insert_articles(cur, articles[:middle])
+            second = self._insert_articles(cur, articles[middle:])
+            return first[0] + second[0], first[1] + second[1]
+
+    def get_all_article_urls(self) -> List[str]:
+        """登録済みの全記事URLを取得"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                for art in articles:
-                    try:
-                        # 重複チェック
-                        cur.execute(
-                            "SELECT 1 FROM \"Article\" WHERE title=%s AND \"articleUrl\"=%s AND source=%s",
-                            (art.title, art.url, art.source)
-                        )
-                        if cur.fetchone():
-                            skipped += 1
-                            continue
-                        
-                        # 記事を挿入（id フィールドを明示的に指定してUUID自動生成を有効化）
-                        cur.execute(
-                            """
-                            INSERT INTO "Article" (id, title, "articleUrl", source, summary, labels, "thumbnailUrl", "publishedAt", "fullText")
-                            VALUES (gen_random_uuid(), %s, %s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                art.title,
-                                art.url,
-                                art.source,
-                                art.summary,
-                                art.labels if art.labels else [],
-                                art.thumbnail_url or "",
-                                art.published,
-                                art.content
-                            )
-                        )
-                        inserted += 1
-                    except Exception as e:
-                        print(f"[ERROR] save_articles: {e} (title={art.title})")
-        
-        return {"inserted": inserted, "skipped": skipped}
-    
+                cur.execute(SELECT_ALL_ARTICLE_URLS_SQL)
+                return [row["articleUrl"] for row in cur.fetchall()]
+
+    def find_existing_article_urls(self, urls: List[str]) -> List[str]:
+        """指定URLのうち登録済みのものを取得"""
+        if not urls:
+            return []
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(SELECT_EXISTING_ARTICLE_URLS_SQL, (list(urls),))
+                return [row["articleUrl"] for row in cur.fetchall()]
+
     def get_articles_without_summary(self, limit: int = 100) -> List[dict]:
         """要約されていない記事を取得"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, title, "articleUrl" as url, source, "fullText" as content, "publishedAt" as published
-                    FROM "Article" 
-                    WHERE summary IS NULL OR summary = '' 
-                    ORDER BY "publishedAt" DESC 
-                    LIMIT %s
-                    """,
-                    (limit,)
-                )
+                cur.execute(SELECT_ARTICLES_WITHOUT_SUMMARY_SQL, (limit,))
+                return cur.fetchall()
+
+    def get_articles_for_duplicate_index(self, limit: int = 5000) -> List[dict]:
+        """近似重複インデックス用に本文のある最新記事を取得"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(SELECT_ARTICLES_FOR_DUPLICATE_INDEX_SQL, (limit,))
                 return cur.fetchall()
-    
+
     def get_article_by_id(self, article_id: str) -> Optional[dict]:
         """指定されたIDの記事を取得"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, title, "articleUrl" as url, source, summary, labels, "thumbnailUrl" as thumbnail_url, "publishedAt" as published, "fullText" as content
-                    FROM "Article"
-                    WHERE id = %s
-                    """,
-                    (article_id,)
-                )
+                cur.execute(SELECT_ARTICLE_BY_ID_SQL, (article_id,))
                 return cur.fetchone()
-    
+
+    def get_articles_by_ids(self, article_ids: List[str], columns: Optional[List[str]] = None) -> Tuple[List[dict], List[str]]:
+        """
+        指定IDの記事を1回のクエリで取得
+
+        :param columns: 取得する列（ARTICLE_COLUMNS のキー、省略時は全列）
+        :return: 指定順に並べた記事リストと、見つからなかったIDのリスト
+        """
+        if not article_ids:
+            return [], []
+        query = build_articles_by_ids_query(columns)
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (list(dict.fromkeys(str(article_id) for article_id in article_ids)),))
+                return order_by_ids(article_ids, cur.fetchall())
+
     def update_article_summary_and_labels(self, article_id: str, summary: str, labels: List[str]) -> None:
         """記事の要約とラベルを更新"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE \"Article\" SET summary=%s, labels=%s WHERE id=%s",
-                    (summary, labels, article_id)
-                )
-    
+                cur.execute(UPDATE_ARTICLE_SUMMARY_AND_LABELS_SQL, (summary, labels, article_id))
+
     def update_article_summary(self, article_id: str, summary: str) -> None:
         """記事の要約のみを更新"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE \"Article\" SET summary=%s WHERE id=%s",
-                    (summary, article_id)
-                )
-    
+                cur.execute(UPDATE_ARTICLE_SUMMARY_SQL, (summary, article_id))
+
     def update_article_field(self, article_id: str, field_name: str, value) -> None:
         """記事の特定フィールドを更新"""
+        query = build_field_update(field_name)
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                # フィールド名のサニタイゼーション（SQLインジェクション対策）
-                allowed_fields = ["summary", "labels", "categories", "thumbnailUrl"]
-                if field_name not in allowed_fields:
-                    raise ValueError(f"Field '{field_name}' is not allowed for update")
-                
-                # PostgreSQLのフィールド名を適切にクォート
-                quoted_field = f'"{field_name}"'
-                query = f"UPDATE \"Article\" SET {quoted_field}=%s WHERE id=%s"
-                
                 cur.execute(query, (value, article_id))
-    
+
+    def bulk_update_articles(self, field_names: List[str], rows: List[tuple]) -> int:
+        """
+        複数記事のフィールドを1文で更新し、更新件数を返す
+
+        :param field_names: 更新するフィールド名（ALLOWED_UPDATE_FIELDS のいずれか）
+        :param rows: (記事ID, 値1, 値2, ...) のタプルのリスト
+        """
+        if not rows:
+            return 0
+        query = build_bulk_update(field_names, len(rows))
+        params = [value for row in rows for value in row]
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.rowcount
+
     def get_latest_articles(self, limit: int = 10) -> List[dict]:
         """最新記事を取得"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, title, "articleUrl" as url, source, summary, labels, "thumbnailUrl" as thumbnail_url, "publishedAt" as published, "fullText" as content
-                    FROM "Article"
-                    ORDER BY "publishedAt" DESC NULLS LAST, "createdAt" DESC
-                    LIMIT %s
-                    """,
-                    (limit,)
-                )
+                cur.execute(SELECT_LATEST_ARTICLES_SQL, (limit,))
                 return cur.fetchall()
-    
+
     def save_topic(self, topic: Topic) -> str:
         """TOPICSを保存"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO "Topic" (title, content, "publishDate")
-                    VALUES (%s, %s, %s)
-                    RETURNING id
-                    """,
-                    (topic.title, topic.content, topic.published_date)
-                )
+                cur.execute(INSERT_TOPIC_SQL, (topic.title, topic.content, topic.published_date))
                 topic_id = cur.fetchone()["id"]
-                
+
                 # 記事とTOPICSの関連を保存
                 for article_id in topic.article_ids:
-                    cur.execute(
-                        """
-                        INSERT INTO "TopicsArticle" ("topicId", "articleId")
-                        VALUES (%s, %s)
-                        """,
-                        (topic_id, article_id)
-                    )
-                
+                    cur.execute(INSERT_TOPICS_ARTICLE_SQL, (topic_id, article_id))
+
                 return str(topic_id)
-    
+
     def get_topic_by_id(self, topic_id: str) -> Optional[dict]:
         """TOPICS詳細を取得"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, title, content, "publishDate", "createdAt"
-                    FROM "Topic"
-                    WHERE id = %s
-                    """,
-                    (topic_id,)
-                )
+                cur.execute(SELECT_TOPIC_BY_ID_SQL, (topic_id,))
                 return cur.fetchone()
-    
+
     def get_articles_by_topic_id(self, topic_id: str) -> List[dict]:
         """TOPICS に紐づく記事を取得"""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT a.id, a.title, a."articleUrl" as url, a.source, a.summary, a.labels, a."thumbnailUrl" as thumbnail_url, a."publishedAt" as published, a."fullText" as content
-                    FROM "TopicsArticle" ta
-                    JOIN "Article" a ON ta."articleId" = a.id
-                    WHERE ta."topicId" = %s
-                    ORDER BY a."publishedAt" DESC NULLS LAST, a."createdAt" DESC
-                    """,
-                    (topic_id,)
-                )
+                cur.execute(SELECT_ARTICLES_BY_TOPIC_ID_SQL, (topic_id,))
                 return cur.fetchall()
 
 
@@ -0,0 +1,183 @@
+"""
+RSSフィードの条件付きGETキャッシュ
+フィードごとの ETag / Last-Modified とレスポンス本文をSQLiteに保存し、
+If-None-Match / If-Modified-Since を送って 304 の場合はダウンロードを省略する
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from adapters.host_health import host_health, is_retryable_error, RETRYABLE_STATUSES
+from adapters.host_scheduler import host_scheduler
+from adapters.http_client import http_client
+
+
+@dataclass
+class FeedFetchResult:
+    """フィード取得結果"""
+    content: bytes
+    not_modified: bool = False
+
+
+class FeedCache:
+    """フィード単位のバリデータ（ETag / Last-Modified）ストア"""
+
+    def __init__(self):
+        cache_dir = Path(os.environ.get("PIPELINE_CACHE_DIR", "cache"))
+        self.db_path = cache_dir / "feed_cache.sqlite3"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feed_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body BLOB,
+                    fetched_at REAL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """保存済みバリデータから条件付きGET用のヘッダーを作成"""
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT etag, last_modified, body IS NOT NULL FROM feed_cache WHERE url = ?", (url,)
+            ).fetchone()
+        # 本文を保持していない場合は304を受けても使えないため送らない
+        if not row or not row[2]:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def record_not_modified(self, url: str) -> Optional[bytes]:
+        """304を受けた場合にヒットを記録し、保存済みの本文を返す"""
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute("SELECT body FROM feed_cache WHERE url = ?", (url,)).fetchone()
+            conn.execute(
+                "UPDATE feed_cache SET hits = hits + 1, fetched_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
+            conn.commit()
+        if not row or row[0] is None:
+            return None
+        return zlib.decompress(row[0])
+
+    def record_response(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+        """200を受けた場合にミスを記録し、バリデータと本文を保存"""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT INTO feed_cache (url, etag, last_modified, body, fetched_at, hits, misses)
+                VALUES (?, ?, ?, ?, ?, 0, 1)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    body = excluded.body,
+                    fetched_at = excluded.fetched_at,
+                    misses = feed_cache.misses + 1
+                """,
+                (url, etag, last_modified, zlib.compress(body), time.time())
+            )
+            conn.commit()
+
+    async def fetch(self, url: str, timeout: Optional[aiohttp.ClientTimeout] = None) -> Optional[FeedFetchResult]:
+        """条件付きGETでフィードを取得（取得失敗時・サーキットが開いている場合はNone）"""
+        try:
+            host_health.check(url)
+        except Exception as e:
+            print(f"[WARN] Feed fetch skipped: {e} ({url})")
+            return None
+        timeout = host_health.timeout_for(url, timeout or aiohttp.ClientTimeout(total=host_health.max_timeout))
+        session = http_client.get_session()
+        for use_validators in (True, False):
+            # SQLiteの読み書きはイベントループを止めないようスレッドで実行
+            headers = await asyncio.to_thread(self.conditional_headers, url) if use_validators else {}
+            async with host_scheduler.slot(url):
+                started = time.monotonic()
+                try:
+                    async with session.get(url, headers=headers, timeout=timeout) as response:
+                        if response.status == 304:
+                            host_health.record_success(url, time.monotonic() - started)
+                            content = await asyncio.to_thread(self.record_not_modified, url)
+                            if content is not None:
+                                return FeedFetchResult(content=content, not_modified=True)
+                            # 保存済み本文が読めない場合はバリデータなしで取り直す
+                            continue
+                        if response.status != 200:
+                            print(f"[WARN] Feed fetch failed: HTTP {response.status} ({url})")
+                            if response.status in RETRYABLE_STATUSES:
+                                host_health.record_failure(url, Exception(f"HTTP {response.status}"))
+                            else:
+                                # 404等はホスト自体は応答しているため障害として扱わない
+                                host_health.record_success(url, time.monotonic() - started)
+                            return None
+                        content = await response.read()
+                except Exception as e:
+                    if is_retryable_error(e):
+                        host_health.record_failure(url, e)
+                    raise
+                host_health.record_success(url, time.monotonic() - started)
+                await asyncio.to_thread(self.record_response, url, response.headers.get("ETag"), response.headers.get("Last-Modified"), content)
+                return FeedFetchResult(content=content)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """フィード単位のヒット/ミス件数を取得"""
+        with self._lock:
+            rows = self._get_conn().execute(
+                "SELECT url, hits, misses, fetched_at FROM feed_cache ORDER BY url"
+            ).fetchall()
+        feeds = [
+            {
+                "url": url,
+                "hits": hits,
+                "misses": misses,
+                "last_fetched_at": fetched_at,
+            }
+            for url, hits, misses, fetched_at in rows
+        ]
+        total_hits = sum(f["hits"] for f in feeds)
+        total_misses = sum(f["misses"] for f in feeds)
+        total = total_hits + total_misses
+        return {
+            "feeds": feeds,
+            "total_hits": total_hits,
+            "total_misses": total_misses,
+            "hit_rate": round(total_hits / total, 3) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        """SQLite接続を閉じる"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# グローバルインスタンス
+feed_cache = FeedCache()
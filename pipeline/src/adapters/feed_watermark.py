@@ -0,0 +1,118 @@
+"""
+フィード別ウォーターマーク
+フィードごとに処理済みの最新エントリー（GUIDと公開日時）をSQLiteに永続化し、
+増分収集ではウォーターマークより新しいエントリーだけを処理する
+"""
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class FeedWatermark:
+    """フィードで処理済みの最新エントリー"""
+    guid: str
+    published: datetime
+
+    def is_behind(self, guid: str, published: datetime) -> bool:
+        """エントリーがウォーターマーク以前（処理済み）かどうか"""
+        if published < self.published:
+            return True
+        return published == self.published and guid == self.guid
+
+
+def entry_guid(entry: Any) -> str:
+    """エントリーのGUID（id がなければリンク）"""
+    return getattr(entry, "id", None) or getattr(entry, "link", "") or ""
+
+
+def newest_processed(processed: Iterable[Tuple[str, datetime]], failed: Iterable[datetime] = ()) -> Optional[Tuple[str, datetime]]:
+    """
+    ウォーターマークとして記録できる最新エントリー（GUIDと公開日時）を返す
+
+    失敗したエントリーを次回の増分収集で再処理できるよう、
+    最も古い失敗エントリーより前に処理したエントリーだけを対象とする。
+    """
+    limit = min(failed, default=None)
+    candidates = [item for item in processed if limit is None or item[1] < limit]
+    return max(candidates, key=lambda item: item[1], default=None)
+
+
+class FeedWatermarkStore:
+    """フィード別ウォーターマークのSQLiteストア"""
+
+    def __init__(self):
+        cache_dir = Path(os.environ.get("PIPELINE_CACHE_DIR", "cache"))
+        self.db_path = cache_dir / "feed_watermark.sqlite3"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feed_watermark (
+                    url TEXT PRIMARY KEY,
+                    guid TEXT NOT NULL,
+                    published TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> Optional[FeedWatermark]:
+        """フィードのウォーターマークを取得（未登録の場合はNone）"""
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT guid, published FROM feed_watermark WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return FeedWatermark(guid=row[0], published=datetime.fromisoformat(row[1]))
+
+    def advance(self, url: str, guid: str, published: datetime) -> None:
+        """ウォーターマークを更新（保存済みより新しい場合のみ）"""
+        current = self.get(url)
+        if current is not None and published <= current.published:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO feed_watermark (url, guid, published, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (url, guid, published.isoformat(), time.time())
+            )
+            conn.commit()
+
+    def advance_all(self, watermarks: Dict[str, Tuple[str, datetime]]) -> None:
+        """フィードURLごとの (GUID, 公開日時) でウォーターマークを更新（記事の保存成功後に呼び出す）"""
+        for url, (guid, published) in watermarks.items():
+            self.advance(url, guid, published)
+
+    def get_stats(self) -> Dict[str, Dict[str, str]]:
+        """フィード別のウォーターマークを取得"""
+        with self._lock:
+            rows = self._get_conn().execute("SELECT url, guid, published FROM feed_watermark").fetchall()
+        return {url: {"guid": guid, "published": published} for url, guid, published in rows}
+
+    def close(self) -> None:
+        """SQLite接続を閉じる"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# グローバルインスタンス
+feed_watermark_store = FeedWatermarkStore()
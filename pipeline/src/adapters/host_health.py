@@ -0,0 +1,159 @@
+"""
+ホスト健全性トラッカー
+ホストごとのレイテンシ（p50/p95）とエラー率を記録し、
+観測したp95からタイムアウトを決め、連続して失敗するホストはサーキットを開いて一定時間スキップする
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+# 再試行・障害扱いとするHTTPステータス
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """サーキットが開いているホストへのリクエスト"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"circuit open for {host} (retry after {retry_after:.0f}s)")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """タイムアウト・接続エラー・5xx/429 のみ再試行対象（ホスト障害）とする"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
+def _percentile(values: Deque[float], ratio: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[int(ratio * (len(ordered) - 1))]
+
+
+class HostHealth:
+    """1ホスト分の観測値"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until: Optional[float] = None
+        # 半開状態で試行中のリクエストを許可した時刻
+        self.trial_started: Optional[float] = None
+        self.circuit_opened = 0
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class HostHealthTracker:
+    """ホスト別のレイテンシ・エラー率に基づく適応タイムアウトとサーキットブレーカー"""
+
+    def __init__(self):
+        self.window = int(os.environ.get("HOST_HEALTH_WINDOW", "50"))
+        self.min_samples = int(os.environ.get("HOST_HEALTH_MIN_SAMPLES", "5"))
+        self.timeout_multiplier = float(os.environ.get("HOST_TIMEOUT_MULTIPLIER", "2.0"))
+        self.min_timeout = float(os.environ.get("HOST_TIMEOUT_MIN", "3"))
+        self.max_timeout = float(os.environ.get("HOST_TIMEOUT_MAX", "10"))
+        self.failure_threshold = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.cooldown = float(os.environ.get("CIRCUIT_COOLDOWN_SECONDS", "300"))
+        self._hosts: Dict[str, HostHealth] = {}
+
+    def _health(self, url: str) -> HostHealth:
+        host = urlparse(url).hostname or ""
+        health = self._hosts.get(host)
+        if health is None:
+            health = HostHealth(self.window)
+            self._hosts[host] = health
+        return health
+
+    def check(self, url: str) -> bool:
+        """
+        サーキットが開いている場合は CircuitOpenError を送出
+
+        クールダウン経過後は半開状態として1回だけ試行を許可し（True を返す）、
+        その結果が記録されるまで他のリクエストは引き続き拒否する。
+        試行が成功するとサーキットを閉じ、失敗すると再びサーキットを開く。
+        """
+        health = self._health(url)
+        if health.open_until is None:
+            return False
+        now = time.monotonic()
+        remaining = health.open_until - now
+        if remaining > 0:
+            raise CircuitOpenError(urlparse(url).hostname or "", remaining)
+        # 試行が結果を記録せずに終わった場合に備え、クールダウン経過後は次の試行を許可
+        if health.trial_started is not None and now - health.trial_started < self.cooldown:
+            raise CircuitOpenError(urlparse(url).hostname or "", 0)
+        health.trial_started = now
+        return True
+
+    def timeout_for(self, url: str, default: aiohttp.ClientTimeout) -> aiohttp.ClientTimeout:
+        """観測p95からタイムアウトを決定（サンプル不足の場合は既定値）"""
+        health = self._health(url)
+        if len(health.latencies) < self.min_samples:
+            return default
+        p95 = _percentile(health.latencies, 0.95)
+        total = min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_multiplier))
+        connect = min(default.connect, total) if default.connect else None
+        return aiohttp.ClientTimeout(total=total, connect=connect)
+
+    def record_success(self, url: str, latency: float) -> None:
+        """応答を得られたリクエストを記録"""
+        health = self._health(url)
+        health.latencies.append(latency)
+        health.outcomes.append(True)
+        health.consecutive_failures = 0
+        if health.trial_started is not None:
+            health.open_until = None
+            health.trial_started = None
+            print(f"[INFO] Circuit closed for {urlparse(url).hostname or ''}")
+
+    def record_failure(self, url: str, error: BaseException) -> None:
+        """ホスト障害（タイムアウト・接続エラー・5xx等）を記録し、閾値を超えたらサーキットを開く"""
+        health = self._health(url)
+        health.outcomes.append(False)
+        health.consecutive_failures += 1
+        if health.trial_started is not None:
+            # 半開状態の試行が失敗した場合はすぐにサーキットを開き直す
+            health.trial_started = None
+            health.open_until = None
+        if health.consecutive_failures >= self.failure_threshold and health.open_until is None:
+            health.open_until = time.monotonic() + self.cooldown
+            health.circuit_opened += 1
+            host = urlparse(url).hostname or ""
+            print(f"[WARN] Circuit opened for {host} ({health.consecutive_failures} consecutive failures, last: {error!r})")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """ホスト別のレイテンシ・エラー率・サーキット状態を取得"""
+        now = time.monotonic()
+        stats = {}
+        for host, health in self._hosts.items():
+            p50 = _percentile(health.latencies, 0.5)
+            p95 = _percentile(health.latencies, 0.95)
+            stats[host] = {
+                "samples": len(health.outcomes),
+                "p50_seconds": round(p50, 3) if p50 is not None else None,
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "error_rate": round(health.error_rate(), 3),
+                "consecutive_failures": health.consecutive_failures,
+                "circuit_open": health.open_until is not None and health.open_until > now,
+                "half_open": health.trial_started is not None,
+                "circuit_opened": health.circuit_opened,
+            }
+        return stats
+
+
+# グローバルインスタンス
+host_health = HostHealthTracker()
@@ -0,0 +1,150 @@
+"""
+ホスト単位の取得スケジューラ
+ホストごとのトークンバケットでリクエスト間隔を制御し、robots.txt の Crawl-delay を尊重する。
+ホスト枠→トークン→全体枠の順に確保することで、待機中のホストが全体枠を占有せず
+複数ホストの処理が公平に交互実行される
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from adapters.concurrency import HostConcurrencyLimiter
+from adapters.http_client import http_client
+
+
+class TokenBucket:
+    """トークンバケット（rate: 毎秒補充数, capacity: バースト上限）"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        # 待機順を保つためロックで直列化（asyncio.LockはFIFO）
+        self._lock = asyncio.Lock()
+
+    def set_rate(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+
+    async def acquire(self) -> None:
+        """トークンを1つ取得（不足している場合は補充まで待機）"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostScheduler:
+    """ホスト単位のレート制御・同時実行数制御を行う取得スケジューラ"""
+
+    def __init__(self):
+        self.default_rate = float(os.environ.get("HOST_RATE_PER_SECOND", "2.0"))
+        self.burst = float(os.environ.get("HOST_BURST", "4"))
+        self.respect_robots = os.environ.get("HOST_RESPECT_ROBOTS", "true").lower() != "false"
+        self.robots_ttl = float(os.environ.get("ROBOTS_CACHE_TTL_SECONDS", "86400"))
+        self.max_crawl_delay = float(os.environ.get("HOST_MAX_CRAWL_DELAY", "30"))
+        self.limiter = HostConcurrencyLimiter(
+            total=int(os.environ.get("SCRAPER_MAX_CONCURRENCY", "16")),
+            per_host=int(os.environ.get("SCRAPER_MAX_PER_HOST", "4")),
+        )
+        self._buckets: Dict[str, TokenBucket] = {}
+        # ホスト → (有効期限, Crawl-delay)
+        self._robots: Dict[str, Tuple[float, Optional[float]]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+
+    async def _fetch_crawl_delay(self, scheme: str, host: str) -> Optional[float]:
+        """robots.txt から Crawl-delay を取得（取得できない場合はNone）"""
+        try:
+            session = http_client.get_session()
+            timeout = aiohttp.ClientTimeout(total=5)
+            async with session.get(f"{scheme}://{host}/robots.txt", timeout=timeout) as response:
+                if response.status != 200:
+                    return None
+                text = await response.text(errors="ignore")
+        except Exception as e:
+            print(f"[WARN] robots.txt fetch failed ({host}): {e}")
+            return None
+
+        parser = RobotFileParser()
+        parser.parse(text.splitlines())
+        # parse() だけでは読み込み時刻が設定されず crawl_delay() がNoneを返すため明示的に設定
+        parser.modified()
+        user_agent = http_client.headers.get("User-Agent", "*")
+        delay = parser.crawl_delay(user_agent)
+        if delay is None:
+            rate = parser.request_rate(user_agent)
+            if rate and rate.requests:
+                delay = rate.seconds / rate.requests
+        return float(delay) if delay is not None else None
+
+    async def _crawl_delay(self, url: str) -> Optional[float]:
+        """キャッシュ済みの Crawl-delay を取得（期限切れの場合は再取得）"""
+        parsed = urlparse(url)
+        host = parsed.hostname or ""
+        cached = self._robots.get(host)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        lock = self._robots_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            cached = self._robots.get(host)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            delay = await self._fetch_crawl_delay(parsed.scheme or "https", parsed.netloc)
+            self._robots[host] = (time.monotonic() + self.robots_ttl, delay)
+            if delay:
+                print(f"[INFO] robots.txt Crawl-delay for {host}: {delay}s")
+            return delay
+
+    async def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).hostname or ""
+        rate, capacity = self.default_rate, self.burst
+        if self.respect_robots:
+            delay = await self._crawl_delay(url)
+            if delay and delay > 0:
+                delay = min(delay, self.max_crawl_delay)
+                rate, capacity = min(rate, 1.0 / delay), 1.0
+
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            self._buckets[host] = bucket
+        elif bucket.rate != rate or bucket.capacity != capacity:
+            bucket.set_rate(rate, capacity)
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """URLを取得してよい順番まで待機し、取得中は実行枠を確保する"""
+        async with self.limiter.host_slot(url):
+            bucket = await self._bucket(url)
+            await bucket.acquire()
+            async with self.limiter.total_slot():
+                yield
+
+    def get_stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """ホスト別のレート設定を取得"""
+        return {
+            host: {
+                "rate_per_second": round(bucket.rate, 3),
+                "crawl_delay": self._robots.get(host, (0, None))[1],
+            }
+            for host, bucket in self._buckets.items()
+        }
+
+
+# グローバルインスタンス
+host_scheduler = HostScheduler()
@@ -0,0 +1,65 @@
+"""
+共有HTTPクライアント
+RSS取得と記事スクレイピングで1つのaiohttpセッションを使い回し、
+Keep-Alive接続の再利用・DNSキャッシュ・ホスト単位の同時接続数制限を行う
+"""
+import os
+from typing import Optional
+
+import aiohttp
+
+
+class SharedHTTPClient:
+    """アプリ全体で共有する長寿命HTTPクライアント"""
+
+    def __init__(self):
+        self.limit = int(os.environ.get("HTTP_POOL_LIMIT", "100"))
+        self.limit_per_host = int(os.environ.get("HTTP_POOL_LIMIT_PER_HOST", "6"))
+        self.dns_cache_ttl = int(os.environ.get("HTTP_DNS_CACHE_TTL", "300"))
+        self.keepalive_timeout = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "30"))
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """コネクションプール付きのセッションを作成"""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=30, connect=10),
+        )
+
+    async def start(self) -> None:
+        """セッションを作成（lifespan起動時に呼び出す）"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+            print(f"[INFO] Shared HTTP client started (limit={self.limit}, limit_per_host={self.limit_per_host})")
+
+    async def close(self) -> None:
+        """セッションを閉じる（lifespan終了時に呼び出す）"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            print("[INFO] Shared HTTP client closed")
+        self._session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        共有セッションを取得
+
+        lifespan外（スクリプト実行など）から呼ばれた場合は遅延生成する。
+        イベントループ上のコルーチンからのみ呼び出すこと。
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+
+# グローバルインスタンス
+http_client = SharedHTTPClient()
@@ -0,0 +1,198 @@
+"""
+記事ページキャッシュ
+正規化URLをキーに圧縮HTMLと抽出結果（本文・og:image等）をSQLiteに保存する。
+TTLで期限切れとし、合計サイズの上限を超えたら最終アクセスの古い順に削除する（LRU）
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from entities.page_content import PageContent
+from utils.url_utils import normalize_url
+
+
+@dataclass
+class CachedPage:
+    """
+    キャッシュ済みページ
+
+    html は抽出ロジックのバージョンが古く再抽出が必要な場合のみ読み込む（それ以外はNone）
+    """
+    html: Optional[bytes]
+    page: PageContent
+    extractor_version: int
+
+
+class PageCache:
+    """TTL・LRU付きのディスクページキャッシュ"""
+
+    def __init__(self):
+        cache_dir = Path(os.environ.get("PIPELINE_CACHE_DIR", "cache"))
+        self.db_path = cache_dir / "page_cache.sqlite3"
+        self.enabled = os.environ.get("PAGE_CACHE_ENABLED", "true").lower() != "false"
+        self.ttl = float(os.environ.get("PAGE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.max_bytes = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS page_cache (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    html BLOB NOT NULL,
+                    text TEXT,
+                    image_url TEXT,
+                    title TEXT,
+                    description TEXT,
+                    canonical_url TEXT,
+                    extractor_version INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS page_cache_accessed_at ON page_cache (accessed_at)")
+            self._conn.commit()
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()
+            self._total_bytes = row[0]
+        return self._conn
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str, extractor_version: int) -> Optional[CachedPage]:
+        """
+        キャッシュからページを取得（期限切れ・未登録の場合はNone）
+
+        保存時の抽出ロジックのバージョンが extractor_version と異なる場合のみ、
+        再抽出用の圧縮HTMLを読み込んで展開する。
+        SQLiteアクセスと展開はブロッキング処理のため、非同期処理からはスレッドで呼び出すこと。
+        """
+        if not self.enabled:
+            return None
+        key = self._key(url)
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                """
+                SELECT text, image_url, title, description, canonical_url, extractor_version, size, created_at
+                FROM page_cache WHERE key = ?
+                """,
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            text, image_url, title, description, canonical_url, stored_version, size, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM page_cache WHERE key = ?", (key,))
+                conn.commit()
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+            html = None
+            if stored_version != extractor_version:
+                html = conn.execute("SELECT html FROM page_cache WHERE key = ?", (key,)).fetchone()[0]
+            conn.execute("UPDATE page_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+
+        page = PageContent(
+            url=url,
+            text=text or "",
+            image_url=image_url,
+            title=title,
+            description=description,
+            canonical_url=canonical_url,
+        )
+        return CachedPage(html=zlib.decompress(html) if html is not None else None, page=page, extractor_version=stored_version)
+
+    def put(self, url: str, html: bytes, page: PageContent, extractor_version: int) -> None:
+        """ページをキャッシュに保存し、上限を超えた場合はLRUで削除（非同期処理からはスレッドで呼び出すこと）"""
+        if not self.enabled:
+            return
+        key = self._key(url)
+        compressed = zlib.compress(html)
+        size = len(compressed) + len(page.text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            old = conn.execute("SELECT size FROM page_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO page_cache
+                    (key, url, html, text, image_url, title, description, canonical_url,
+                     extractor_version, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key, url, compressed, page.text, page.image_url, page.title,
+                    page.description, page.canonical_url, extractor_version, size, now, now
+                )
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """期限切れを削除し、なお上限を超える場合は最終アクセスの古い順に削除"""
+        conn.execute("DELETE FROM page_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()[0]
+        # 上限の9割まで減らして頻繁な削除を避ける
+        target = int(self.max_bytes * 0.9)
+        if self._total_bytes <= target:
+            return
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM page_cache ORDER BY accessed_at ASC"):
+            victims.append((key,))
+            freed += size
+            if self._total_bytes - freed <= target:
+                break
+        conn.executemany("DELETE FROM page_cache WHERE key = ?", victims)
+        self._total_bytes -= freed
+        print(f"[INFO] Page cache evicted {len(victims)} pages ({freed} bytes)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュのヒット率・サイズを取得"""
+        with self._lock:
+            entries = self._get_conn().execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        """SQLite接続を閉じる"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# グローバルインスタンス
+page_cache = PageCache()
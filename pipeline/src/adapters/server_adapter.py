@@ -0,0 +1,43 @@
+"""
+Express API（server）呼び出し用アダプター
+共有HTTPクライアントで記事の一括登録APIを呼び出す
+"""
+import os
+from typing import Any, Dict, List
+
+import aiohttp
+
+from adapters.http_client import http_client
+
+
+class ServerAPIError(Exception):
+    """Express APIがエラーレスポンスを返した場合の例外"""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class ServerAdapter:
+    """Express API呼び出し用アダプター"""
+
+    def __init__(self):
+        self.base_url = os.environ.get("SERVER_URL_INTERNAL", "http://server:4000").rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=30)
+
+    async def batch_create_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """記事を一括登録（/api/articles/batch_create）"""
+        session = http_client.get_session()
+        async with session.post(
+            f"{self.base_url}/api/articles/batch_create",
+            json={"articles": articles},
+            timeout=self.timeout
+        ) as response:
+            if response.status != 200:
+                raise ServerAPIError(response.status, (await response.text())[:200])
+            return await response.json()
+
+
+# グローバルインスタンス
+server_adapter = ServerAdapter()
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+@dataclass
+class FeedEntry:
+    """
+    RSS/Atom フィードのエントリーを表すエンティティ（収集に必要な項目のみ保持）
+
+    :param id: GUID（guid / atom:id）
+    :param title: タイトル
+    :param link: 記事URL
+    :param published: 公開日時の文字列（pubDate / published / dc:date）
+    :param updated: 更新日時の文字列（atom:updated）
+    :param summary: 概要（description / summary）
+    :param image_url: サムネイル画像URL（media:content / media:thumbnail / enclosure / 概要内のimg）
+    :param published_dt: 解析済みの公開日時（解析できない場合はNone）
+    """
+    id: str = ""
+    title: str = ""
+    link: str = ""
+    published: Optional[str] = None
+    updated: Optional[str] = None
+    summary: str = ""
+    image_url: Optional[str] = None
+    published_dt: Optional[datetime] = None
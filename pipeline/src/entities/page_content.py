@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class PageContent:
+    """
+    記事ページから抽出したデータを表すエンティティ
+
+    :param url: 記事URL
+    :param text: 記事本文
+    :param image_url: OGP / Twitter Card 画像URL
+    :param title: ページタイトル（og:title または title タグ）
+    :param description: ページ説明（og:description または meta description）
+    :param canonical_url: 正規URL（link rel=canonical または og:url）
+    """
+    url: str
+    text: str = ""
+    image_url: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    canonical_url: Optional[str] = None
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import List
+
+@dataclass
+class FeedDefinition:
+    """
+    RSSフィード定義を表すエンティティ
+
+    :param url: フィードURL
+    :param category: 収集時に使用するカテゴリ
+    """
+    url: str
+    category: str = "general"
+
+@dataclass
+class SourceDefinition:
+    """
+    収集ソース（rss_feeds.yaml の sources 配下の1件）を表すエンティティ
+
+    :param id: フロントエンドで使用するソースID（例: "itmedia"）
+    :param name: 表示名（YAMLのキー、記事の source として保存される）
+    :param feeds: フィード定義のリスト
+    """
+    id: str
+    name: str
+    feeds: List[FeedDefinition] = field(default_factory=list)
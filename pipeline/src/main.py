@@ -1,26 +1,44 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Callable, Awaitable
 import asyncio
+import json
 import aiohttp
-import feedparser
-from datetime import datetime, timedelta
-import requests
-import yaml
-from pathlib import Path
+from datetime import datetime
 
 # ルーターのインポート
 from routers.crawl_router import router as crawl_router
 from routers.summarize_router import router as summarize_router
 from routers.topics_router import router as topics_router
 from routers.llm_router import router as llm_router
+from routers.jobs_router import router as jobs_router
 
 # サービスのインポート
 from services.scraping_service import scraping_service
 from adapters.llm_adapter import llm_adapter
+from adapters.http_client import http_client
+from adapters.feed_cache import feed_cache
+from adapters.page_cache import page_cache
+from adapters.feed_watermark import feed_watermark_store, entry_guid, newest_processed
+from adapters.db_adapter import db_adapter
+from adapters.async_db_adapter import async_db_adapter
+from services.seen_url_index import seen_url_index
+from services.duplicate_index import duplicate_index
+from services.result_writer import result_writer
+from services.ingest_service import ArticleIngestor
+from services.source_registry import source_registry
+from services.feed_reader import feed_reader
+from entities.feed_entry import FeedEntry
+from utils.date_parser import day_range, LOCAL_TZ
+from services.job_service import job_service
+from services.progress import (
+    ProgressReporter, QueueProgressReporter, null_progress,
+    EVENT_FETCHED, EVENT_PARSED, EVENT_SCRAPED, EVENT_SKIPPED, EVENT_ERROR
+)
 
 
 @asynccontextmanager
@@ -44,12 +62,29 @@ async def lifespan(app: FastAPI):
     if missing_vars:
         print(f"[WARN] Missing environment variables: {missing_vars}")
     
+    # DBコネクションプールを開く（同期: サービス・バックグラウンド処理用、非同期: ルート用）
+    db_adapter.open()
+    await async_db_adapter.open()
+    
+    # RSS収集・スクレイピング共通のHTTPクライアントを起動
+    await http_client.start()
+    
     print("[INFO] Pipeline API startup completed")
     
     yield
     
     # 終了時の処理
     print("[INFO] Pipeline API shutting down...")
+    await job_service.shutdown()
+    # バッファ中のLLM処理結果はプールを閉じる前に書き込む
+    await asyncio.to_thread(result_writer.close)
+    await http_client.close()
+    scraping_service.shutdown()
+    feed_cache.close()
+    page_cache.close()
+    feed_watermark_store.close()
+    await async_db_adapter.close()
+    db_adapter.close()
 
 
 # FastAPIアプリケーションの作成
@@ -89,6 +124,7 @@ app.include_router(crawl_router)
 app.include_router(summarize_router)
 app.include_router(topics_router)
 app.include_router(llm_router)
+app.include_router(jobs_router)
 
 
 @app.get("/")
@@ -103,7 +139,8 @@ async def root():
             "crawl": "/api/crawl",
             "summarize": "/api/summarize", 
             "topics": "/api/topics",
-            "llm": "/api/llm"
+            "llm": "/api/llm",
+            "jobs": "/api/jobs"
         }
     }
 
@@ -113,11 +150,9 @@ async def health_check():
     """ヘルスチェックエンドポイント"""
     try:
         # データベース接続確認
-        from adapters.db_adapter import db_adapter
-        with db_adapter.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-                db_status = "healthy"
+        async with await async_db_adapter.get_connection() as conn:
+            await conn.execute("SELECT 1")
+            db_status = "healthy"
     except Exception as e:
         db_status = f"error: {str(e)}"
     
@@ -133,6 +168,9 @@ async def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "database_pool": db_adapter.get_stats(),
+        "database_async_pool": async_db_adapter.get_stats(),
+        "result_writer": result_writer.get_stats(),
         "llm": llm_status,
         "environment": {
             "postgres_host": os.environ.get("POSTGRES_HOST", "not set"),
@@ -149,6 +187,8 @@ async def api_status():
         "available_endpoints": [
             {"path": "/api/crawl", "methods": ["POST"], "description": "RSS記事収集（本文取得のみ）"},
             {"path": "/api/crawl/latest", "methods": ["GET"], "description": "最新記事取得"},
+            {"path": "/api/jobs/{job_id}", "methods": ["GET"], "description": "バックグラウンド収集ジョブの進捗"},
+            {"path": "/collect-rss/stream", "methods": ["POST"], "description": "RSS収集（進捗イベントをSSE/NDJSONで配信）"},
             {"path": "/api/llm/summarize", "methods": ["POST"], "description": "LLM要約・ラベル付け"},
             {"path": "/api/llm/categorize", "methods": ["POST"], "description": "LLMカテゴリ自動分類"},
             {"path": "/api/llm/topics/categorize", "methods": ["POST"], "description": "TOPICS記事カテゴリ分類支援"},
@@ -166,6 +206,10 @@ class RSSCollectRequest(BaseModel):
     sources: List[str]
     startDate: str
     endDate: str
+    # Trueの場合はフィード別ウォーターマークより新しいエントリーのみ処理
+    incremental: bool = False
+    # Trueの場合はジョブとして登録してジョブIDを即時に返す（進捗は /api/jobs/{job_id}）
+    background: bool = False
 
 class ArticleData(BaseModel):
     title: str
@@ -179,281 +223,306 @@ class ArticleData(BaseModel):
 @app.post("/collect-rss")
 async def collect_rss(request: RSSCollectRequest):
     """RSS収集エンドポイント - Express API経由でDB保存"""
-    print(f"RSS収集開始: {request.sources}")
+    if request.background:
+        job = job_service.submit(
+            "collect-rss",
+            request.model_dump(exclude={"background"}),
+            lambda job: run_collect_rss(request, job)
+        )
+        return JSONResponse(status_code=202, content={"job_id": job.id, "status": job.status})
     
-    # rss_feeds.yamlからURL情報を読み込み
-    feeds_file = Path(__file__).parent / "rss_feeds.yaml"
-    with open(feeds_file, 'r', encoding='utf-8') as f:
-        feeds_config = yaml.safe_load(f)
+    try:
+        return await run_collect_rss(request)
+    except Exception as e:
+        print(f"RSS収集処理エラー: {e}")
+        raise HTTPException(status_code=500, detail=f"RSS収集処理に失敗しました: {str(e)}")
+
+
+@app.post("/collect-rss/stream")
+async def collect_rss_stream(request: RSSCollectRequest, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """
+    RSS収集エンドポイント（進捗ストリーミング版）
     
-    # フロントエンドのIDをYAMLのキー（ソース名）にマッピング
-    id_to_source_name = {
-        "eetimes": "EE Times Japan",
-        "itmedia": "ITmedia", 
-        "nhk": "NHK",
-        "mynavi_techplus": "マイナビ Tech+",
-        "nikkei_xtech": "日経XTECH",
-        "gigazine": "GIGAZINE",
-        "semiconductor_today": "Semiconductor Today",
-        "science_potal": "Science Portal",
-        "wired_jp": "WIRED Japan",
-        "techcrunch": "TechCrunch",
-        "wired": "WIRED",
-        "the_verge": "The Verge",
-        "ars_technica": "Ars Technica",
-        "engadget": "Engadget",
-        "mit_technology_review": "MIT Technology Review",
-        "bloomberg": "Bloomberg",
-        "financial_times": "Financial Times",
-        "forbes": "Forbes",
-        "fortune": "Fortune",
-        "the_information": "The Information",
-        "new_york_times": "New York Times",
-        "the_guardian": "The Guardian",
-        "bbc": "BBC",
-        "cnbc": "CNBC",
-        "npr": "NPR",
-        "cbs_news": "CBS News"
-    }
+    fetched / parsed / scraped / saved / skipped / error の進捗イベントを発生順に返し、
+    最後に collect-rss と同じ集計結果を result イベントとして返す。
+    format=sse（既定）は Server-Sent Events、format=ndjson は1行1イベントのJSON。
+    クライアントが切断した場合は収集を中止する。
+    """
+    reporter = QueueProgressReporter()
+    
+    def encode(payload: dict) -> str:
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        if format == "ndjson":
+            return data + "\n"
+        return f"event: {payload['event']}\ndata: {data}\n\n"
+    
+    async def stream():
+        task = asyncio.create_task(run_collect_rss(request, reporter))
+        try:
+            while True:
+                getter = asyncio.create_task(reporter.queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield encode(getter.result())
+                    continue
+                getter.cancel()
+                break
+            
+            # 収集完了後に残っているイベントを送出してから結果を返す
+            while not reporter.queue.empty():
+                yield encode(reporter.queue.get_nowait())
+            try:
+                yield encode({"event": "result", **task.result()})
+            except Exception as e:
+                print(f"RSS収集処理エラー: {e}")
+                yield encode({"event": "result", "success": False, "error": str(e)})
+        finally:
+            if not task.done():
+                task.cancel()
     
-    # 汎用的なソース処理
-    all_sources = feeds_config.get('sources', {})
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def run_collect_rss(request: RSSCollectRequest, progress: ProgressReporter = null_progress) -> dict:
+    """RSS収集を実行してExpress API経由で保存し、collect-rss 形式の集計結果を返す"""
+    print(f"RSS収集開始: {request.sources}")
     
-    collected_articles = []
     tasks = []
+    # 登録済みのため収集前にスキップした記事数
+    collect_stats = {"skipped_known": 0}
+    # 送信に成功した後で更新するフィード別ウォーターマーク
+    watermarks = {}
     
-    print(f"[DEBUG] Available sources in YAML: {list(all_sources.keys())}")
+    # 収集した記事はフィードの完了を待たずにキュー経由でExpress APIへ順次送信
+    ingestor = ArticleIngestor(progress=progress)
     
-    # リクエストされた各ソースについて処理
+    # リクエストされた各ソースについて処理（フロントエンドのIDまたはソース名で解決）
     for requested_source_id in request.sources:
-        # IDをソース名に変換
-        source_name = id_to_source_name.get(requested_source_id, requested_source_id)
+        source = source_registry.resolve(requested_source_id)
+        if source is None:
+            print(f"[WARN] ソース '{requested_source_id}' が見つかりません")
+            progress.emit(EVENT_ERROR, requested_source_id, error="unknown source")
+            continue
         
-        print(f"[DEBUG] Processing: {requested_source_id} -> {source_name}")
+        print(f"[DEBUG] Processing: {requested_source_id} -> {source.name} ({len(source.feeds)} feeds)")
         
-        if source_name in all_sources:
-            source_config = all_sources[source_name]
-            feeds = source_config.get('feeds', [])
-            
-            print(f"[DEBUG] Found {len(feeds)} feeds for {source_name}")
-            
-            # 複数のフィードを並列で収集
-            for feed_info in feeds:
-                task = collect_from_source(
-                    source_name=source_name,
-                    rss_url=feed_info['url'],
-                    start_date=request.startDate,
-                    end_date=request.endDate,
-                    category=feed_info.get('category', 'general')  # カテゴリ情報は収集時のみ使用
-                )
-                tasks.append(task)
-        else:
-            print(f"[WARN] ソース '{requested_source_id}' (mapped to '{source_name}') が見つかりません")
+        # 複数のフィードを並列で収集
+        for feed in source.feeds:
+            task = collect_from_source(
+                source_name=source.name,
+                rss_url=feed.url,
+                start_date=request.startDate,
+                end_date=request.endDate,
+                category=feed.category,  # カテゴリ情報は収集時のみ使用
+                stats=collect_stats,
+                on_article=ingestor.put,
+                incremental=request.incremental,
+                progress=progress,
+                watermarks=watermarks
+            )
+            tasks.append(task)
     
     # 並列実行
-    try:
+    async with ingestor:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         for result in results:
-            if isinstance(result, list):
-                collected_articles.extend(result)
-            else:
+            if isinstance(result, Exception):
                 print(f"収集エラー: {result}")
-        
-        print(f"RSS収集完了: {len(collected_articles)}件")
-        
-        # Express APIのバッチ作成エンドポイントに送信
-        if collected_articles:
-            try:
-                # 大量データの場合、小分けして送信（20件ずつ）
-                batch_size = 20
-                total_inserted = 0
-                total_skipped = 0
-                total_invalid = 0
-                
-                for i in range(0, len(collected_articles), batch_size):
-                    batch_articles = collected_articles[i:i + batch_size]
-                    print(f"バッチ送信 {i//batch_size + 1}/{(len(collected_articles) + batch_size - 1)//batch_size}: {len(batch_articles)}件")
-                    
-                    batch_response = requests.post(
-                        "http://server:4000/api/articles/batch_create",
-                        json={"articles": batch_articles},
-                        headers={"Content-Type": "application/json"},
-                        timeout=30
-                    )
-                    
-                    if batch_response.status_code == 200:
-                        batch_result = batch_response.json()
-                        total_inserted += batch_result.get('insertedCount', 0)
-                        total_skipped += batch_result.get('skippedCount', 0)
-                        total_invalid += batch_result.get('invalidCount', 0)
-                        print(f"  バッチ保存完了: inserted={batch_result.get('insertedCount', 0)}, skipped={batch_result.get('skippedCount', 0)}")
-                    else:
-                        print(f"  バッチ保存エラー: {batch_response.status_code} {batch_response.text[:200]}")
-                        total_invalid += len(batch_articles)
-                
-                print(f"全バッチ処理完了: total_inserted={total_inserted}, total_skipped={total_skipped}, total_invalid={total_invalid}")
-                return {
-                    "success": True,
-                    "insertedCount": total_inserted,
-                    "skippedCount": total_skipped,
-                    "invalidCount": total_invalid,
-                    "invalidItems": []
-                }
-            except Exception as e:
-                print(f"Express API呼び出しエラー: {e}")
-                return {
-                    "success": False,
-                    "error": "サーバー通信エラー",
-                    "insertedCount": 0,
-                    "skippedCount": 0,
-                    "invalidCount": len(collected_articles),
-                    "invalidItems": []
-                }
-        else:
-            return {
-                "success": True,
-                "insertedCount": 0,
-                "skippedCount": 0,
-                "invalidCount": 0,
-                "invalidItems": []
-            }
-            
-    except Exception as e:
-        print(f"RSS収集処理エラー: {e}")
-        raise HTTPException(status_code=500, detail=f"RSS収集処理に失敗しました: {str(e)}")
+    
+    result = ingestor.result()
+    # 送信に失敗した記事を次回の増分収集で再処理できるよう、全件送信できた場合のみ記録
+    if result["success"]:
+        feed_watermark_store.advance_all(watermarks)
+    elif watermarks:
+        print(f"[WARN] 送信エラーのためウォーターマークを更新しません ({len(watermarks)}フィード)")
+    result["skippedCount"] += collect_stats["skipped_known"]
+    print(f"全バッチ処理完了: total_inserted={result['insertedCount']}, total_skipped={result['skippedCount']}, total_invalid={result['invalidCount']}")
+    return result
 
 
-async def collect_from_source(source_name: str, rss_url: str, start_date: str, end_date: str, category: str = "general"):
-    """単一ソースからの記事収集（カテゴリ情報は収集時のみ使用）"""
+async def collect_from_source(
+    source_name: str,
+    rss_url: str,
+    start_date: str,
+    end_date: str,
+    category: str = "general",
+    stats: Optional[dict] = None,
+    on_article: Optional[Callable[[dict], Awaitable[None]]] = None,
+    incremental: bool = False,
+    progress: ProgressReporter = null_progress,
+    watermarks: Optional[dict] = None
+):
+    """
+    単一ソースからの記事収集（カテゴリ情報は収集時のみ使用）
+    
+    on_articleが指定された場合、記事は完成した時点で順次コールバックへ渡し、
+    戻り値のリストには含めない（全記事をメモリに保持しない）。
+    incrementalがTrueの場合、フィードのウォーターマーク以前のエントリーは処理しない。
+    watermarksが渡された場合、記録すべき最新エントリー（GUIDと公開日時）を watermarks[rss_url] に格納する。
+    ウォーターマークは記事の保存に成功した後で呼び出し側が更新する。
+    """
     try:
         print(f"{source_name} ({category}): RSS取得開始 - {rss_url}")
         timeout = aiohttp.ClientTimeout(total=15)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(rss_url) as response:
-                if response.status != 200:
-                    print(f"{source_name}: HTTP {response.status}")
-                    return []
-                rss_content = await response.text()
-        
-        feed = feedparser.parse(rss_content)
-        print(f"{source_name} ({category}): フィード解析完了 - {len(feed.entries)}件のエントリー")
-        
-        if not feed.entries:
-            print(f"{source_name}: フィードが空です")
+        # ETag / Last-Modified による条件付きGET（304の場合は保存済みフィードを再利用）
+        fetch_result = await feed_cache.fetch(rss_url, timeout=timeout)
+        if fetch_result is None:
+            progress.emit(EVENT_ERROR, source_name, url=rss_url, error="feed fetch failed")
             return []
-            
-        articles = []
+        if fetch_result.not_modified:
+            print(f"{source_name} ({category}): フィード未更新 (304)")
+        progress.emit(EVENT_FETCHED, source_name, url=rss_url, not_modified=fetch_result.not_modified)
         
         try:
-            start_dt = datetime.fromisoformat(start_date)
-            end_dt = datetime.fromisoformat(end_date) + timedelta(days=1)  # 終了日を含める
+            # 終了日を含めるため [開始日 0:00, 終了日翌日 0:00) のタイムゾーン付き範囲で比較
+            start_dt, end_dt = day_range(start_date, end_date)
         except ValueError:
             print(f"日付形式エラー: {start_date}, {end_date}")
             return []
         
-        print(f"{source_name}: 日付範囲 {start_dt} 〜 {end_dt}")
+        # 増分収集ではウォーターマークより古いエントリーも不要
+        watermark = feed_watermark_store.get(rss_url) if incremental else None
+        since = max(start_dt, watermark.published) if watermark is not None else start_dt
         
-        # デバッグ用：最初の5件の記事情報を表示
-        for i, entry in enumerate(feed.entries[:5]):
-            print(f"{source_name} エントリー{i+1}: {getattr(entry, 'title', 'タイトルなし')}")
-            if hasattr(entry, 'published'):
-                print(f"  公開日: {entry.published}")
+        # エントリーを逐次解析（新しい順のフィードは since より古いエントリーで打ち切り）
+        entries = await asyncio.to_thread(feed_reader.read, rss_url, fetch_result.content, since)
+        print(f"{source_name} ({category}): フィード解析完了 - {len(entries)}件のエントリー")
+        progress.emit(EVENT_PARSED, source_name, url=rss_url, entries=len(entries))
         
-        for entry in feed.entries:
-            try:
-                # 日付解析（複数形式に対応）
-                published_dt = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published_dt = datetime(*entry.published_parsed[:6])
-                elif hasattr(entry, 'published'):
-                    try:
-                        published_dt = datetime.fromisoformat(entry.published.replace('Z', '+00:00'))
-                    except:
-                        # 他の日付形式も試行
-                        from dateutil import parser
-                        published_dt = parser.parse(entry.published)
-                
-                if not published_dt:
-                    print(f"  警告: 日付解析失敗 - {getattr(entry, 'title', 'タイトルなし')[:50]}")
-                    # 日付が解析できない場合は現在日時を使用
-                    published_dt = datetime.now()
-                
-                # 日付フィルタリング
-                if start_dt <= published_dt <= end_dt:
-                    article_url = entry.link if hasattr(entry, 'link') else ""
-                    article_title = entry.title.strip() if hasattr(entry, 'title') else "タイトル不明"
-                    
-                    # 記事本文とOGP画像をスクレイピング
-                    article_content = ""
-                    og_image = extract_thumbnail(entry)  # RSSから取得できない場合の初期値
-                    
-                    if article_url:
-                        try:
-                            print(f"  記事スクレイピング開始: {article_title[:50]}")
-                            content, scraped_image = await scraping_service.fetch_article_content(article_url)
-                            if content:
-                                article_content = content
-                                print(f"  ✓ 本文取得成功: {len(article_content)}文字")
-                            if scraped_image:
-                                og_image = scraped_image
-                                print(f"  ✓ 画像取得成功: {scraped_image[:50]}...")
-                        except Exception as scrape_error:
-                            print(f"  ✗ スクレイピング失敗: {scrape_error}")
-                    
-                    # RSS収集時はLLM処理をスキップ（別APIで実行）
-                    summary = entry.get("summary", "")[:500] if hasattr(entry, "summary") else ""
-                    
-                    article = {
-                        "title": article_title,
-                        "articleUrl": article_url,
-                        "source": source_name,  # カテゴリ情報はDBに保存しない
-                        "publishedAt": published_dt.isoformat(),
-                        "summary": summary,  # RSS要約のみ
-                        "labels": [],  # 空配列（LLM処理は別途）
-                        "thumbnailUrl": og_image,
-                        "content": article_content  # 本文を保存
-                    }
-                    
-                    # 必須フィールドチェック
-                    if article["title"] and article["articleUrl"]:
-                        articles.append(article)
-                        print(f"  ✓ 記事追加完了: {article_title[:50]}")
+        if not entries:
+            print(f"{source_name}: フィードが空です")
+            return []
             
-            except Exception as entry_error:
-                print(f"{source_name}のエントリ処理エラー: {entry_error}")
-                continue
+        articles = []
+        
+        print(f"{source_name}: 日付範囲 {start_dt} 〜 {end_dt}")
+        
+        # 日付範囲内のエントリーを抽出
+        targets = []
+        # ウォーターマークの候補となるエントリー（日付を解析できたもののみ）
+        dated = []
+        for entry in entries:
+            published_dt = entry.published_dt
+            
+            if published_dt and start_dt <= published_dt < end_dt:
+                dated.append((entry_guid(entry), published_dt))
+            
+            if not published_dt:
+                print(f"  警告: 日付解析失敗 - {entry.title[:50]}")
+                # 日付が解析できない場合は現在日時を使用
+                published_dt = datetime.now(LOCAL_TZ)
+            
+            # 日付フィルタリング
+            if start_dt <= published_dt < end_dt:
+                targets.append((entry, published_dt))
+        
+        # 増分収集: 前回処理した最新エントリー以前はスキップ
+        if watermark is not None:
+            before = len(targets)
+            targets = [(entry, published_dt) for entry, published_dt in targets if not watermark.is_behind(entry_guid(entry), published_dt)]
+            print(f"{source_name}: ウォーターマーク({watermark.published.isoformat()})以前の{before - len(targets)}件をスキップ")
+            if before > len(targets):
+                progress.emit(EVENT_SKIPPED, source_name, count=before - len(targets), reason="watermark")
         
-        print(f"{source_name} ({category})から{len(articles)}件収集")
+        # 登録済みの記事はスクレイピング前にスキップ
+        known_urls = await seen_url_index.find_known(entry.link for entry, _ in targets)
+        if known_urls:
+            targets = [(entry, published_dt) for entry, published_dt in targets if entry.link not in known_urls]
+            print(f"{source_name}: 登録済み記事 {len(known_urls)}件をスキップ")
+            progress.emit(EVENT_SKIPPED, source_name, count=len(known_urls), reason="known")
+            if stats is not None:
+                stats["skipped_known"] = stats.get("skipped_known", 0) + len(known_urls)
+        
+        collected = 0
+        
+        async def process(entry, published_dt: datetime) -> None:
+            nonlocal collected
+            article = await build_article(source_name, entry, published_dt)
+            if not article:
+                return
+            collected += 1
+            progress.emit(EVENT_SCRAPED, source_name, url=article["articleUrl"], title=article["title"], has_content=bool(article["content"]))
+            if on_article is not None:
+                await on_article(article)
+            else:
+                articles.append(article)
+        
+        # 記事本文のスクレイピングを並列実行（同時実行数はscraping_service側で制限）
+        results = await asyncio.gather(
+            *[process(entry, published_dt) for entry, published_dt in targets],
+            return_exceptions=True
+        )
+        failed = []
+        for (entry, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                print(f"{source_name}のエントリ処理エラー: {result}")
+                progress.emit(EVENT_ERROR, source_name, url=rss_url, error=str(result))
+                if entry.published_dt:
+                    failed.append(entry.published_dt)
+        
+        # 失敗したエントリーより先へはウォーターマークを進めない
+        newest = newest_processed(dated, failed)
+        if watermarks is not None and newest is not None:
+            watermarks[rss_url] = newest
+        
+        print(f"{source_name} ({category})から{collected}件収集")
         return articles
         
     except Exception as e:
         print(f"{source_name}の収集でエラー: {e}")
+        progress.emit(EVENT_ERROR, source_name, url=rss_url, error=str(e))
         return []
 
-def extract_thumbnail(entry):
-    """エントリからサムネイル画像を抽出"""
-    try:
-        # media:content チェック
-        if hasattr(entry, 'media_content'):
-            for media in entry.media_content:
-                if media.get('type', '').startswith('image/'):
-                    return media.get('url')
-        
-        # enclosure チェック
-        if hasattr(entry, 'enclosures'):
-            for enclosure in entry.enclosures:
-                if enclosure.get('type', '').startswith('image/'):
-                    return enclosure.get('href')
-                    
-        # summary内の画像タグをチェック
-        if hasattr(entry, 'summary'):
-            import re
-            img_match = re.search(r'<img[^>]+src="([^"]+)"', entry.summary)
-            if img_match:
-                return img_match.group(1)
-                
-    except Exception:
-        pass
+async def build_article(source_name: str, entry: FeedEntry, published_dt: datetime) -> Optional[dict]:
+    """エントリーの記事本文とOGP画像をスクレイピングして記事データを作成"""
+    article_url = entry.link
+    article_title = entry.title or "タイトル不明"
+    
+    # 記事本文とOGP画像をスクレイピング
+    article_content = ""
+    og_image = entry.image_url  # RSSから取得できない場合の初期値
+    
+    if article_url:
+        try:
+            print(f"  記事スクレイピング開始: {article_title[:50]}")
+            content, scraped_image = await scraping_service.fetch_article_content(article_url)
+            if content:
+                article_content = content
+                print(f"  ✓ 本文取得成功: {len(article_content)}文字")
+            if scraped_image:
+                og_image = scraped_image
+                print(f"  ✓ 画像取得成功: {scraped_image[:50]}...")
+        except Exception as scrape_error:
+            print(f"  ✗ スクレイピング失敗: {scrape_error}")
+    
+    # RSS収集時はLLM処理をスキップ（別APIで実行）
+    summary = entry.summary[:500]
+    labels = []
+    
+    # 他媒体の同一記事（近似重複）が処理済みなら要約・ラベルを再利用
+    canonical = await asyncio.to_thread(duplicate_index.find, article_content) if article_content else None
+    if canonical:
+        summary = canonical.summary
+        labels = canonical.labels
+        duplicate_index.record_reuse()
+        print(f"  ✓ 重複記事の要約を再利用: {canonical.article_id}")
+    
+    article = {
+        "title": article_title,
+        "articleUrl": article_url,
+        "source": source_name,  # カテゴリ情報はDBに保存しない
+        "publishedAt": published_dt.isoformat(),
+        "summary": summary,  # RSS要約、または重複元記事の要約
+        "labels": labels,  # 重複元記事がなければ空配列（LLM処理は別途）
+        "thumbnailUrl": og_image,
+        "content": article_content  # 本文を保存
+    }
+    
+    # 必須フィールドチェック
+    if not (article["title"] and article["articleUrl"]):
+        return None
     
-    return None
+    print(f"  ✓ 記事追加完了: {article_title[:50]}")
+    return article
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional, Union
 from datetime import date, datetime, timedelta
 from pydantic import BaseModel
 
 from services.crawl_service import crawl_service
-from adapters.db_adapter import db_adapter
+from adapters.async_db_adapter import async_db_adapter
+from adapters.feed_cache import feed_cache
+from adapters.page_cache import page_cache
+from adapters.host_scheduler import host_scheduler
+from adapters.host_health import host_health
+from adapters.feed_watermark import feed_watermark_store
+from services.job_service import job_service
+from services.progress import ProgressReporter, null_progress, EVENT_SAVED
 
 router = APIRouter(prefix="/api", tags=["crawl"])
 
@@ -14,6 +21,10 @@ class CrawlRequest(BaseModel):
     end_date: Optional[date] = None
     days: Optional[int] = 7
     sources: Optional[List[str]] = None
+    # Trueの場合はフィード別ウォーターマークより新しいエントリーのみ処理
+    incremental: bool = False
+    # Trueの場合はジョブとして登録してジョブIDを即時に返す（進捗は /api/jobs/{job_id}）
+    background: bool = False
 
 
 class CrawlResponse(BaseModel):
@@ -21,65 +32,109 @@ class CrawlResponse(BaseModel):
     articles_found: int
     articles_saved: int
     articles_skipped: int
+    # タイトル・URLがなく保存しなかった記事数
+    articles_invalid: int = 0
+    # 挿入エラーで保存できなかった記事数
+    articles_failed: int = 0
     start_date: str
     end_date: str
 
 
-@router.post("/crawl", response_model=CrawlResponse)
-async def crawl_articles(request: CrawlRequest):
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+
+
+def _advance_watermarks(watermarks: dict, save_result: dict) -> None:
+    """保存に成功してからウォーターマークを進める（保存できなかった記事がある場合は次回再収集する）"""
+    if save_result["failed"]:
+        print(f"[WARN] {save_result['failed']}件の保存に失敗したためウォーターマークを更新しません")
+        return
+    feed_watermark_store.advance_all(watermarks)
+
+
+async def run_crawl(start_date: date, end_date: date, sources: Optional[List[str]] = None, incremental: bool = False, progress: ProgressReporter = null_progress) -> CrawlResponse:
+    """RSS記事を収集してデータベースに保存"""
+    print(f"[DEBUG] Crawl period: {start_date} to {end_date}")
+    print(f"[DEBUG] Sources: {sources}")
+    
+    # RSS記事を収集（登録済みの記事はスクレイピング前にスキップ）
+    crawl_stats = {"skipped_known": 0}
+    watermarks = {}
+    articles = await crawl_service.fetch_articles_from_period(start_date, end_date, sources, crawl_stats, incremental, progress, watermarks)
+    
+    print(f"[DEBUG] Articles found: {len(articles)}")
+    
+    if not articles:
+        # 保存する記事がない場合もスキップしたエントリーまでは処理済み
+        feed_watermark_store.advance_all(watermarks)
+        return CrawlResponse(
+            message="No articles found for the specified period",
+            articles_found=0,
+            articles_saved=0,
+            articles_skipped=crawl_stats["skipped_known"],
+            start_date=str(start_date),
+            end_date=str(end_date)
+        )
+    
+    # データベースに保存（非同期DBアダプターでイベントループを止めない）
+    save_result = await async_db_adapter.save_articles(articles)
+    progress.emit(EVENT_SAVED, count=save_result["inserted"], skipped=save_result["skipped"], invalid=save_result["invalid"], failed=save_result["failed"])
+    _advance_watermarks(watermarks, save_result)
+    
+    print(f"[DEBUG] Save result: {save_result}")
+    
+    return CrawlResponse(
+        message="Crawl completed successfully",
+        articles_found=len(articles),
+        articles_saved=save_result["inserted"],
+        articles_skipped=save_result["skipped"] + crawl_stats["skipped_known"],
+        articles_invalid=save_result["invalid"],
+        articles_failed=save_result["failed"],
+        start_date=str(start_date),
+        end_date=str(end_date)
+    )
+
+
+@router.post("/crawl", response_model=Union[CrawlResponse, JobResponse])
+async def crawl_articles(request: CrawlRequest, response: Response):
     """
     RSS記事収集バッチ実行
     
     指定された期間のRSS記事を収集してデータベースに保存します。
+    background=true の場合はジョブとして登録し、ジョブIDを即時に返します（202）。
     """
-    try:
-        print(f"[DEBUG] Crawl request received: {request}")
-        
-        # 期間の設定
-        if request.start_date and request.end_date:
-            start_date = request.start_date
-            end_date = request.end_date
-        else:
-            days = request.days or 7
-            end_date = date.today()
-            start_date = end_date - timedelta(days=days)
-        
-        print(f"[DEBUG] Crawl period: {start_date} to {end_date}")
-        print(f"[DEBUG] Sources: {request.sources}")
-        
-        # RSS記事を収集
-        articles = crawl_service.fetch_articles_from_period(start_date, end_date, request.sources)
-        
-        print(f"[DEBUG] Articles found: {len(articles)}")
-        
-        if not articles:
-            return CrawlResponse(
-                message="No articles found for the specified period",
-                articles_found=0,
-                articles_saved=0,
-                articles_skipped=0,
-                start_date=str(start_date),
-                end_date=str(end_date)
-            )
-        
-        # データベースに保存
-        save_result = db_adapter.save_articles(articles)
-        
-        print(f"[DEBUG] Save result: {save_result}")
-        
-        return CrawlResponse(
-            message="Crawl completed successfully",
-            articles_found=len(articles),
-            articles_saved=save_result["inserted"],
-            articles_skipped=save_result["skipped"],
-            start_date=str(start_date),
-            end_date=str(end_date)
+    print(f"[DEBUG] Crawl request received: {request}")
+    
+    # 期間の設定
+    if request.start_date and request.end_date:
+        start_date = request.start_date
+        end_date = request.end_date
+    else:
+        days = request.days or 7
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days)
+    
+    if request.background:
+        job = job_service.submit(
+            "crawl",
+            {"start_date": str(start_date), "end_date": str(end_date), "sources": request.sources, "incremental": request.incremental},
+            lambda job: _run_crawl_job(start_date, end_date, request.sources, request.incremental, job)
         )
-        
+        response.status_code = 202
+        return JobResponse(job_id=job.id, status=job.status)
+    
+    try:
+        return await run_crawl(start_date, end_date, request.sources, request.incremental)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Crawl failed: {str(e)}")
 
 
+async def _run_crawl_job(start_date: date, end_date: date, sources: Optional[List[str]], incremental: bool, job: ProgressReporter) -> dict:
+    result = await run_crawl(start_date, end_date, sources, incremental, job)
+    return result.model_dump()
+
+
 @router.get("/crawl/latest")
 async def get_latest_articles(limit: int = Query(10, ge=1, le=100)):
     """
@@ -88,7 +143,7 @@ async def get_latest_articles(limit: int = Query(10, ge=1, le=100)):
     データベースから最新の記事を指定件数取得します。
     """
     try:
-        articles = db_adapter.get_latest_articles(limit)
+        articles = await async_db_adapter.get_latest_articles(limit)
         
         return {
             "message": f"Retrieved {len(articles)} latest articles",
@@ -100,22 +155,102 @@ async def get_latest_articles(limit: int = Query(10, ge=1, le=100)):
 
 
 @router.post("/crawl/manual")
-async def manual_crawl():
+async def manual_crawl(response: Response, background: bool = Query(False)):
     """
     手動クロール実行
 
     記事を手動で収集します。
+    background=true の場合はジョブとして登録し、ジョブIDを即時に返します（202）。
     """
+    if background:
+        job = job_service.submit("crawl-manual", {"days": 7}, _run_manual_crawl)
+        response.status_code = 202
+        return JobResponse(job_id=job.id, status=job.status)
+    
     try:
-        articles = crawl_service.fetch_latest_articles(days=7)
-        save_result = db_adapter.save_articles(articles)
-        
-        return {
-            "message": "Manual crawl completed",
-            "articles_found": len(articles),
-            "articles_saved": save_result["inserted"],
-            "articles_skipped": save_result["skipped"]
-        }
-        
+        return await _run_manual_crawl()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Manual crawl failed: {str(e)}")
+
+
+async def _run_manual_crawl(progress: ProgressReporter = null_progress) -> dict:
+    crawl_stats = {"skipped_known": 0}
+    watermarks = {}
+    articles = await crawl_service.fetch_latest_articles(days=7, stats=crawl_stats, progress=progress, watermarks=watermarks)
+    save_result = await async_db_adapter.save_articles(articles)
+    progress.emit(EVENT_SAVED, count=save_result["inserted"], skipped=save_result["skipped"], invalid=save_result["invalid"], failed=save_result["failed"])
+    _advance_watermarks(watermarks, save_result)
+    
+    return {
+        "message": "Manual crawl completed",
+        "articles_found": len(articles),
+        "articles_saved": save_result["inserted"],
+        "articles_skipped": save_result["skipped"] + crawl_stats["skipped_known"],
+        "articles_invalid": save_result["invalid"],
+        "articles_failed": save_result["failed"]
+    }
+
+
+@router.get("/crawl/feed-cache")
+async def get_feed_cache_stats():
+    """
+    フィードキャッシュ統計を取得
+
+    条件付きGET（ETag / Last-Modified）のフィード別ヒット・ミス件数を返します。
+    """
+    try:
+        return feed_cache.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get feed cache stats: {str(e)}")
+
+
+@router.get("/crawl/page-cache")
+async def get_page_cache_stats():
+    """
+    ページキャッシュ統計を取得
+
+    記事ページキャッシュのヒット率・件数・サイズを返します。
+    """
+    try:
+        return page_cache.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get page cache stats: {str(e)}")
+
+
+@router.get("/crawl/hosts")
+async def get_host_schedule_stats():
+    """
+    ホスト別の取得レートを取得
+
+    ホストごとのトークンバケットのレートと robots.txt の Crawl-delay を返します。
+    """
+    try:
+        return host_scheduler.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get host stats: {str(e)}")
+
+
+@router.get("/crawl/host-health")
+async def get_host_health_stats():
+    """
+    ホスト別の健全性を取得
+
+    ホストごとのレイテンシ（p50/p95）・エラー率・サーキット状態を返します。
+    """
+    try:
+        return host_health.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get host health: {str(e)}")
+
+
+@router.get("/crawl/watermarks")
+async def get_feed_watermarks():
+    """
+    フィード別ウォーターマークを取得
+
+    増分収集で使用する、フィードごとの処理済み最新エントリー（GUID・公開日時）を返します。
+    """
+    try:
+        return feed_watermark_store.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get watermarks: {str(e)}")
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+
+from services.job_service import job_service
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+
+@router.get("/jobs")
+async def list_jobs():
+    """
+    収集ジョブ一覧を取得
+
+    バックグラウンドで実行中・完了済みの収集ジョブを新しい順に返します。
+    """
+    return {
+        "max_concurrent": job_service.max_concurrent,
+        "jobs": [job.to_dict() for job in job_service.list()]
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    収集ジョブの進捗を取得
+
+    ソース別の進捗・イベント別件数・スループット・エラー・完了時の結果を返します。
+    """
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
@@ -2,6 +2,7 @@
 LLM処理専用ルーター
 要約・ラベル生成・カテゴリ分類・TOPICS生成を個別のAPIとして提供
 """
+import asyncio
 from fastapi import APIRouter, HTTPException
 from typing import List, Optional
 from pydantic import BaseModel
@@ -9,8 +10,10 @@ from pydantic import BaseModel
 from services.summarize_service import summarize_service
 from services.categorize_service import categorize_service
 from services.export_service import export_service
+from services.duplicate_index import duplicate_index
+from services.result_writer import result_writer
 from adapters.llm_adapter import llm_adapter
-from adapters.db_adapter import db_adapter
+from adapters.async_db_adapter import async_db_adapter
 from datetime import datetime
 
 router = APIRouter(prefix="/api/llm", tags=["llm"])
@@ -53,6 +56,23 @@ class LLMLabelsOnlyRequest(BaseModel):
     limit: Optional[int] = 50
 
 
+async def _flush_results(results: List[dict]) -> int:
+    """
+    バッファした更新を書き込み、DBに書き込めなかった記事の結果を error に置き換える
+
+    置き換えた件数を返す（呼び出し側で processed から errors へ移す）。
+    """
+    written_ids = [result["id"] for result in results if result["status"] in ("success", "reused")]
+    unwritten = await asyncio.to_thread(result_writer.flush, written_ids)
+    failed = 0
+    for result in results:
+        if result["id"] in unwritten and result["status"] in ("success", "reused"):
+            result["status"] = "error"
+            result["error"] = unwritten[result["id"]]
+            failed += 1
+    return failed
+
+
 @router.post("/summarize")
 async def generate_summaries_and_labels(request: LLMSummarizeRequest):
     """
@@ -68,15 +88,18 @@ async def generate_summaries_and_labels(request: LLMSummarizeRequest):
             errors = 0
             results = []
             
-            for article_id in request.article_ids:
+            # 記事を1回のクエリでまとめて取得
+            articles, _ = await async_db_adapter.get_articles_by_ids(request.article_ids, columns=["title", "content"])
+            articles_by_id = {str(article["id"]): article for article in articles}
+            
+            # 指定順に処理して結果を返す（見つからない記事はその位置に not_found として含める）
+            for article_id in dict.fromkeys(str(article_id) for article_id in request.article_ids):
+                article = articles_by_id.get(article_id)
+                if article is None:
+                    errors += 1
+                    results.append({"id": article_id, "status": "not_found"})
+                    continue
                 try:
-                    # 記事を取得
-                    article = db_adapter.get_article_by_id(article_id)
-                    if not article:
-                        errors += 1
-                        results.append({"id": article_id, "status": "not_found"})
-                        continue
-                    
                     # 本文またはタイトルから要約生成
                     content = article.get("content", "") or article.get("title", "")
                     if not content:
@@ -84,13 +107,25 @@ async def generate_summaries_and_labels(request: LLMSummarizeRequest):
                         results.append({"id": article_id, "status": "no_content"})
                         continue
                     
+                    # 近似重複記事が処理済みなら要約・ラベルを再利用
+                    canonical = await asyncio.to_thread(summarize_service.reuse_duplicate_summary, article_id, article.get("content") or "")
+                    if canonical:
+                        processed += 1
+                        results.append({
+                            "id": article_id,
+                            "status": "reused",
+                            "duplicate_of": canonical.article_id,
+                            "labels": canonical.labels
+                        })
+                        continue
+                    
                     # LLM処理
-                    summary, labels = llm_adapter.generate_summary_and_labels(content)
+                    summary, labels = await asyncio.to_thread(llm_adapter.generate_summary_and_labels, content)
                     
                     # DB更新
-                    db_adapter.update_article_summary_and_labels(
-                        article_id, summary, labels
-                    )
+                    result_writer.write(article_id, summary=summary, labels=labels)
+                    # 指紋計算とインデックスの再読み込みはイベントループを止めないようスレッドで実行
+                    await asyncio.to_thread(duplicate_index.add, article_id, article.get("content") or "", summary, labels)
                     
                     processed += 1
                     results.append({
@@ -104,6 +139,11 @@ async def generate_summaries_and_labels(request: LLMSummarizeRequest):
                     errors += 1
                     results.append({"id": article_id, "status": "error", "error": str(e)})
             
+            # バッファした更新を書き込んでから応答（書き込めなかった記事はエラーとして返す）
+            failed_writes = await _flush_results(results)
+            processed -= failed_writes
+            errors += failed_writes
+            
             return {
                 "message": "LLM summarization completed",
                 "processed": processed,
@@ -113,7 +153,7 @@ async def generate_summaries_and_labels(request: LLMSummarizeRequest):
             
         else:
             # 要約がない記事を自動処理
-            result = summarize_service.summarize_articles(request.limit)
+            result = await asyncio.to_thread(summarize_service.summarize_articles, request.limit)
             return result
             
     except Exception as e:
@@ -135,14 +175,18 @@ async def categorize_articles(request: LLMCategorizeRequest):
             errors = 0
             results = []
             
-            for article_id in request.article_ids:
+            # 記事を1回のクエリでまとめて取得
+            articles, _ = await async_db_adapter.get_articles_by_ids(request.article_ids, columns=["title", "summary", "content"])
+            articles_by_id = {str(article["id"]): article for article in articles}
+            
+            # 指定順に処理して結果を返す（見つからない記事はその位置に not_found として含める）
+            for article_id in dict.fromkeys(str(article_id) for article_id in request.article_ids):
+                article = articles_by_id.get(article_id)
+                if article is None:
+                    errors += 1
+                    results.append({"id": article_id, "status": "not_found"})
+                    continue
                 try:
-                    article = db_adapter.get_article_by_id(article_id)
-                    if not article:
-                        errors += 1
-                        results.append({"id": article_id, "status": "not_found"})
-                        continue
-                    
                     content = article.get("content", "") or article.get("summary", "") or article.get("title", "")
                     if not content:
                         errors += 1
@@ -150,10 +194,10 @@ async def categorize_articles(request: LLMCategorizeRequest):
                         continue
                     
                     # カテゴリ生成
-                    categories = llm_adapter.generate_categories(content)
+                    categories = await asyncio.to_thread(llm_adapter.generate_categories, content)
                     
                     # DB更新（カテゴリフィールドを更新）
-                    db_adapter.update_article_field(article_id, "categories", categories)
+                    result_writer.write(article_id, categories=categories)
                     
                     processed += 1
                     results.append({
@@ -166,6 +210,11 @@ async def categorize_articles(request: LLMCategorizeRequest):
                     errors += 1
                     results.append({"id": article_id, "status": "error", "error": str(e)})
             
+            # バッファした更新を書き込んでから応答（書き込めなかった記事はエラーとして返す）
+            failed_writes = await _flush_results(results)
+            processed -= failed_writes
+            errors += failed_writes
+            
             return {
                 "message": "Categorization completed",
                 "processed": processed,
@@ -175,7 +224,7 @@ async def categorize_articles(request: LLMCategorizeRequest):
             
         else:
             # カテゴリがない記事を自動処理
-            result = categorize_service.categorize_articles(limit=request.limit)
+            result = await asyncio.to_thread(categorize_service.categorize_articles, limit=request.limit)
             return result
             
     except Exception as e:
@@ -192,11 +241,9 @@ async def categorize_topics_articles(request: TopicsCategorizationRequest):
     """
     try:
         # 記事を取得
-        articles = []
-        for article_id in request.article_ids:
-            article = db_adapter.get_article_by_id(article_id)
-            if article:
-                articles.append(article)
+        articles, _ = await async_db_adapter.get_articles_by_ids(
+            request.article_ids, columns=["title", "summary", "content"]
+        )
         
         if not articles:
             raise HTTPException(status_code=404, detail="No valid articles found")
@@ -217,14 +264,14 @@ async def categorize_topics_articles(request: TopicsCategorizationRequest):
                 
                 if request.categorization_type == "hierarchical":
                     # 階層的カテゴリ分類（大カテゴリ→小カテゴリ）
-                    primary_categories = llm_adapter.generate_categories(content)
+                    primary_categories = await asyncio.to_thread(llm_adapter.generate_categories, content)
                     
                     # 新4カテゴリシステムでは小カテゴリは使用しない
                     subcategories = []
                     
                 else:
                     # テーマ別カテゴリ分類
-                    primary_categories = llm_adapter.generate_categories(content)
+                    primary_categories = await asyncio.to_thread(llm_adapter.generate_categories, content)
                     subcategories = []
                 
                 # 結果を構築
@@ -292,11 +339,9 @@ async def generate_topics_summary(request: TopicsSummaryRequest):
     """
     try:
         # 記事を取得
-        articles = []
-        for article_id in request.article_ids:
-            article = db_adapter.get_article_by_id(article_id)
-            if article:
-                articles.append(article)
+        articles, _ = await async_db_adapter.get_articles_by_ids(
+            request.article_ids, columns=["title", "summary"]
+        )
         
         if not articles:
             raise HTTPException(status_code=404, detail="No valid articles found")
@@ -341,7 +386,7 @@ TOPICSの全体サマリ:
 """
         
         # 月次まとめ機能を利用してサマリ生成
-        topics_summary = llm_adapter.generate_monthly_summary([full_prompt])
+        topics_summary = await asyncio.to_thread(llm_adapter.generate_monthly_summary, [full_prompt])
         
         # 補足情報の生成
         key_themes = []
@@ -385,7 +430,7 @@ async def get_llm_status():
         # テスト実行
         test_result = "healthy"
         try:
-            test_summary, test_labels = llm_adapter.generate_summary_and_labels("test content")
+            test_summary, test_labels = await asyncio.to_thread(llm_adapter.generate_summary_and_labels, "test content")
             if not test_summary or not test_labels:
                 test_result = "partial"
         except Exception as e:
@@ -407,6 +452,16 @@ async def get_llm_status():
         raise HTTPException(status_code=500, detail=f"Status check failed: {str(e)}")
 
 
+@router.get("/duplicates")
+async def get_duplicate_index_stats():
+    """
+    近似重複インデックスの統計
+
+    登録記事数と、要約・ラベルを再利用した件数を返します。
+    """
+    return duplicate_index.get_stats()
+
+
 @router.post("/summarize-only")
 async def generate_summaries_only(request: LLMSummarizeOnlyRequest):
     """
@@ -421,14 +476,18 @@ async def generate_summaries_only(request: LLMSummarizeOnlyRequest):
             errors = 0
             results = []
             
-            for article_id in request.article_ids:
+            # 記事を1回のクエリでまとめて取得
+            articles, _ = await async_db_adapter.get_articles_by_ids(request.article_ids, columns=["title", "content"])
+            articles_by_id = {str(article["id"]): article for article in articles}
+            
+            # 指定順に処理して結果を返す（見つからない記事はその位置に not_found として含める）
+            for article_id in dict.fromkeys(str(article_id) for article_id in request.article_ids):
+                article = articles_by_id.get(article_id)
+                if article is None:
+                    errors += 1
+                    results.append({"id": article_id, "status": "not_found"})
+                    continue
                 try:
-                    article = db_adapter.get_article_by_id(article_id)
-                    if not article:
-                        errors += 1
-                        results.append({"id": article_id, "status": "not_found"})
-                        continue
-                    
                     content = article.get("content", "") or article.get("title", "")
                     if not content:
                         errors += 1
@@ -436,10 +495,10 @@ async def generate_summaries_only(request: LLMSummarizeOnlyRequest):
                         continue
                     
                     # 要約のみ生成（内部的には同じLLM呼び出しを使用）
-                    summary, _ = llm_adapter.generate_summary_and_labels(content)
+                    summary, _ = await asyncio.to_thread(llm_adapter.generate_summary_and_labels, content)
                     
                     # 要約のみ更新
-                    db_adapter.update_article_field(article_id, "summary", summary)
+                    result_writer.write(article_id, summary=summary)
                     
                     processed += 1
                     results.append({
@@ -452,6 +511,11 @@ async def generate_summaries_only(request: LLMSummarizeOnlyRequest):
                     errors += 1
                     results.append({"id": article_id, "status": "error", "error": str(e)})
             
+            # バッファした更新を書き込んでから応答（書き込めなかった記事はエラーとして返す）
+            failed_writes = await _flush_results(results)
+            processed -= failed_writes
+            errors += failed_writes
+            
             return {
                 "message": "Summary-only generation completed",
                 "processed": processed,
@@ -481,14 +545,18 @@ async def generate_labels_only(request: LLMLabelsOnlyRequest):
             errors = 0
             results = []
             
-            for article_id in request.article_ids:
+            # 記事を1回のクエリでまとめて取得
+            articles, _ = await async_db_adapter.get_articles_by_ids(request.article_ids, columns=["title", "summary", "content"])
+            articles_by_id = {str(article["id"]): article for article in articles}
+            
+            # 指定順に処理して結果を返す（見つからない記事はその位置に not_found として含める）
+            for article_id in dict.fromkeys(str(article_id) for article_id in request.article_ids):
+                article = articles_by_id.get(article_id)
+                if article is None:
+                    errors += 1
+                    results.append({"id": article_id, "status": "not_found"})
+                    continue
                 try:
-                    article = db_adapter.get_article_by_id(article_id)
-                    if not article:
-                        errors += 1
-                        results.append({"id": article_id, "status": "not_found"})
-                        continue
-                    
                     content = article.get("content", "") or article.get("summary", "") or article.get("title", "")
                     if not content:
                         errors += 1
@@ -496,10 +564,10 @@ async def generate_labels_only(request: LLMLabelsOnlyRequest):
                         continue
                     
                     # ラベルのみ生成（内部的には同じLLM呼び出しを使用）
-                    _, labels = llm_adapter.generate_summary_and_labels(content)
+                    _, labels = await asyncio.to_thread(llm_adapter.generate_summary_and_labels, content)
                     
                     # ラベルのみ更新
-                    db_adapter.update_article_field(article_id, "labels", labels)
+                    result_writer.write(article_id, labels=labels)
                     
                     processed += 1
                     results.append({
@@ -512,6 +580,11 @@ async def generate_labels_only(request: LLMLabelsOnlyRequest):
                     errors += 1
                     results.append({"id": article_id, "status": "error", "error": str(e)})
             
+            # バッファした更新を書き込んでから応答（書き込めなかった記事はエラーとして返す）
+            failed_writes = await _flush_results(results)
+            processed -= failed_writes
+            errors += failed_writes
+            
             return {
                 "message": "Labels-only generation completed", 
                 "processed": processed,
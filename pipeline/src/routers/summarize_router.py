@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from pydantic import BaseModel
@@ -38,14 +39,16 @@ async def summarize_articles(request: SummarizeRequest):
     try:
         if request.article_ids:
             # 特定の記事を処理
-            result = summarize_service.summarize_specific_articles(
+            result = await asyncio.to_thread(
+                summarize_service.summarize_specific_articles,
                 article_ids=request.article_ids,
                 include_labeling=request.include_labeling,
                 model_name=request.model_name
             )
         else:
             # 要約されていない記事を一括処理
-            result = summarize_service.summarize_articles(
+            result = await asyncio.to_thread(
+                summarize_service.summarize_articles,
                 limit=request.limit or 50,
                 include_labeling=request.include_labeling,
                 model_name=request.model_name
@@ -75,7 +78,8 @@ async def categorize_articles(request: CategorizeRequest):
     記事の内容に基づいて自動的にカテゴリを分類します。
     """
     try:
-        result = categorize_service.categorize_articles(
+        result = await asyncio.to_thread(
+            categorize_service.categorize_articles,
             article_ids=request.article_ids,
             limit=request.limit or 50
         )
@@ -146,7 +150,7 @@ async def batch_process_articles(
         results = []
         
         # 要約処理
-        summarize_result = summarize_service.summarize_articles(limit)
+        summarize_result = await asyncio.to_thread(summarize_service.summarize_articles, limit)
         results.append({
             "step": "summarization",
             "result": summarize_result
@@ -154,7 +158,7 @@ async def batch_process_articles(
         
         # カテゴリ分類処理（オプション）
         if include_categorization:
-            categorize_result = categorize_service.categorize_articles(limit=limit)
+            categorize_result = await asyncio.to_thread(categorize_service.categorize_articles, limit=limit)
             results.append({
                 "step": "categorization", 
                 "result": categorize_result
@@ -1,9 +1,10 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from pydantic import BaseModel
 
 from services.export_service import export_service
-from adapters.db_adapter import db_adapter
+from adapters.async_db_adapter import async_db_adapter
 
 router = APIRouter(prefix="/api", tags=["topics"])
 
@@ -38,7 +39,8 @@ async def generate_topics(request: GenerateTopicsRequest):
         if not request.article_ids:
             raise HTTPException(status_code=400, detail="Article IDs are required")
         
-        result = export_service.generate_topics_template(
+        result = await asyncio.to_thread(
+            export_service.generate_topics_template,
             article_ids=request.article_ids,
             template_type=request.template_type or "default"
         )
@@ -68,13 +70,13 @@ async def get_topics_detail(topic_id: str):
     指定されたTOPICS IDの詳細情報を取得します。
     """
     try:
-        topic = db_adapter.get_topic_by_id(topic_id)
+        topic = await async_db_adapter.get_topic_by_id(topic_id)
         
         if not topic:
             raise HTTPException(status_code=404, detail="Topic not found")
         
         # 関連記事も取得
-        articles = db_adapter.get_articles_by_topic_id(topic_id)
+        articles = await async_db_adapter.get_articles_by_topic_id(topic_id)
         
         return {
             "topic": topic,
@@ -96,7 +98,8 @@ async def export_topics(request: ExportTopicsRequest):
     指定されたTOPICSを指定された形式でファイルにエクスポートします。
     """
     try:
-        result = export_service.export_topics_to_file(
+        result = await asyncio.to_thread(
+            export_service.export_topics_to_file,
             topic_id=request.topic_id,
             format_type=request.format_type or "markdown"
         )
@@ -185,14 +188,15 @@ async def regenerate_topics(topic_id: str, template_type: Optional[str] = "defau
     """
     try:
         # 既存TOPICSから記事IDを取得
-        articles = db_adapter.get_articles_by_topic_id(topic_id)
+        articles = await async_db_adapter.get_articles_by_topic_id(topic_id)
         article_ids = [str(article["id"]) for article in articles]
         
         if not article_ids:
             raise HTTPException(status_code=404, detail="No articles found for this topic")
         
         # 新しいテンプレートで再生成
-        result = export_service.generate_topics_template(
+        result = await asyncio.to_thread(
+            export_service.generate_topics_template,
             article_ids=article_ids,
             template_type=template_type or "default"
         )
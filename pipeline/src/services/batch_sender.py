@@ -0,0 +1,155 @@
+"""
+適応型バッチ送信
+Express APIの batch_create へ記事を並列に送信する。
+観測したレイテンシとペイロードサイズからバッチサイズを増減し、
+失敗したバッチは半分に分割して再送する
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import aiohttp
+
+from adapters.server_adapter import server_adapter, ServerAPIError
+from services.progress import ProgressReporter, null_progress, EVENT_SAVED, EVENT_ERROR
+
+
+class AdaptiveBatchSender:
+    """並列・適応バッチサイズの一括送信コンポーネント"""
+
+    def __init__(
+        self,
+        send_func: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]] = None,
+        progress: ProgressReporter = null_progress
+    ):
+        self.send_func = send_func or server_adapter.batch_create_articles
+        self.progress = progress
+        self.concurrency = int(os.environ.get("BATCH_SENDER_CONCURRENCY", "4"))
+        self.min_batch_size = int(os.environ.get("BATCH_SENDER_MIN_SIZE", "5"))
+        self.max_batch_size = int(os.environ.get("BATCH_SENDER_MAX_SIZE", "200"))
+        self.batch_size = int(os.environ.get("INGEST_BATCH_SIZE", "20"))
+        # 1バッチあたりの目標レイテンシ（秒）と最大ペイロード（バイト）
+        self.target_latency = float(os.environ.get("BATCH_SENDER_TARGET_LATENCY", "2.0"))
+        self.max_payload_bytes = int(os.environ.get("BATCH_SENDER_MAX_PAYLOAD_BYTES", str(4 * 1024 * 1024)))
+        # 失敗したバッチを分割して再送するまでの待ち時間（秒）
+        self.retry_delay = float(os.environ.get("BATCH_SENDER_RETRY_DELAY", "0.5"))
+        self._semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.errors: List[str] = []
+
+    @staticmethod
+    def _payload_size(article: Dict[str, Any]) -> int:
+        return len(json.dumps(article, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def take_batch(self, buffer: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """現在のバッチサイズとペイロード上限に収まる分をバッファ先頭から取り出す"""
+        count = 0
+        payload = 0
+        for article in buffer[:self.batch_size]:
+            size = self._payload_size(article)
+            if count and payload + size > self.max_payload_bytes:
+                break
+            payload += size
+            count += 1
+        batch = buffer[:count]
+        del buffer[:count]
+        return batch
+
+    async def submit(self, batch: List[Dict[str, Any]]) -> None:
+        """バッチを送信キューに投入（同時送信数が上限の場合は空くまで待機）"""
+        if not batch:
+            return
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """送信中のバッチがすべて完了するまで待機"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def result(self) -> Dict[str, Any]:
+        """collect-rss 互換の集計結果"""
+        result = {
+            "success": not self.errors,
+            "insertedCount": self.inserted,
+            "skippedCount": self.skipped,
+            "invalidCount": self.invalid,
+            "invalidItems": []
+        }
+        if self.errors:
+            result["error"] = "サーバー通信エラー"
+        return result
+
+    async def _run(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await self._send(batch)
+        finally:
+            self._semaphore.release()
+
+    async def _send(self, batch: List[Dict[str, Any]]) -> None:
+        self.batches += 1
+        batch_no = self.batches
+        print(f"バッチ送信 {batch_no}: {len(batch)}件 (batch_size={self.batch_size})")
+        started = time.monotonic()
+        try:
+            batch_result = await self.send_func(batch)
+        except (ServerAPIError, asyncio.TimeoutError) as e:
+            # エラーレスポンス・タイムアウトは半分に分割して再送
+            print(f"  バッチ保存エラー ({len(batch)}件): {e}")
+            await self._split_and_retry(batch, e)
+            return
+        except aiohttp.ClientConnectionError as e:
+            # 接続できない場合は分割しても成功しないため再送しない
+            print(f"Express API呼び出しエラー: {e}")
+            self.invalid += len(batch)
+            self.errors.append(str(e))
+            self.progress.emit(EVENT_ERROR, count=len(batch), error=str(e))
+            return
+        except Exception as e:
+            print(f"Express API呼び出しエラー: {e}")
+            await self._split_and_retry(batch, e)
+            return
+
+        self._adjust(time.monotonic() - started)
+        self.inserted += batch_result.get('insertedCount', 0)
+        self.skipped += batch_result.get('skippedCount', 0)
+        self.invalid += batch_result.get('invalidCount', 0)
+        self.progress.emit(
+            EVENT_SAVED,
+            count=batch_result.get('insertedCount', 0),
+            skipped=batch_result.get('skippedCount', 0),
+            invalid=batch_result.get('invalidCount', 0)
+        )
+        print(f"  バッチ保存完了 {batch_no}: inserted={batch_result.get('insertedCount', 0)}, skipped={batch_result.get('skippedCount', 0)}")
+
+    async def _split_and_retry(self, batch: List[Dict[str, Any]], error: BaseException) -> None:
+        self._shrink()
+        if len(batch) == 1:
+            # 1件でも保存できない記事は送信エラーとして記録（結果は success=False になる）
+            self.invalid += 1
+            self.errors.append(str(error))
+            self.progress.emit(EVENT_ERROR, count=1, error=str(error))
+            return
+        # 不調なサーバーへ即座に再送が集中しないよう少し待つ
+        await asyncio.sleep(self.retry_delay)
+        middle = len(batch) // 2
+        await self._send(batch[:middle])
+        await self._send(batch[middle:])
+
+    def _adjust(self, latency: float) -> None:
+        """観測レイテンシからバッチサイズを調整（目標より速ければ拡大、遅ければ縮小）"""
+        if latency < self.target_latency / 2:
+            self.batch_size = min(self.max_batch_size, max(self.batch_size + 1, int(self.batch_size * 1.5)))
+        elif latency > self.target_latency:
+            self._shrink()
+
+    def _shrink(self) -> None:
+        self.batch_size = max(self.min_batch_size, self.batch_size // 2)
@@ -1,195 +1,175 @@
-import os
-import re
+import asyncio
 from datetime import datetime, date, timedelta
 from typing import List, Optional
-import yaml
 
-import feedparser
-import httpx
-from bs4 import BeautifulSoup
-from dateutil import parser as date_parser
+import aiohttp
 
 from entities.article import Article
+from entities.feed_entry import FeedEntry
+from adapters.feed_cache import feed_cache
+from adapters.feed_watermark import feed_watermark_store, entry_guid, newest_processed
+from services.scraping_service import scraping_service
+from services.seen_url_index import seen_url_index
+from services.duplicate_index import duplicate_index
+from services.source_registry import source_registry
+from services.feed_reader import feed_reader
+from services.progress import (
+    ProgressReporter, null_progress,
+    EVENT_FETCHED, EVENT_PARSED, EVENT_SCRAPED, EVENT_SKIPPED, EVENT_ERROR
+)
+from utils.date_parser import day_range
 
 
 class CrawlService:
     """RSS収集サービス"""
     
     def __init__(self):
-        self.timeout = 10.0
-        self.rss_feeds_config = self._load_rss_feeds()
+        self.timeout = aiohttp.ClientTimeout(total=10.0)
     
-    def _load_rss_feeds(self) -> dict:
-        """RSS feeds設定をロード"""
-        try:
-            # 複数の可能な場所を試す
-            possible_paths = [
-                "rss_feeds.yaml",
-                "src/rss_feeds.yaml",
-                os.path.join(os.path.dirname(__file__), "..", "rss_feeds.yaml"),
-                "/app/src/rss_feeds.yaml"  # Docker環境用
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    with open(path, "r", encoding="utf-8") as f:
-                        print(f"[INFO] Loaded RSS feeds from: {path}")
-                        return yaml.safe_load(f)
-            
-            print(f"[ERROR] rss_feeds.yaml not found in any of: {possible_paths}")
-            return {}
-        except Exception as e:
-            print(f"[ERROR] Failed to load rss_feeds.yaml: {e}")
-            return {}
-    
-    def fetch_articles_from_period(self, start_date: date, end_date: date, sources: Optional[List[str]] = None) -> List[Article]:
-        """指定期間のRSS記事を収集"""
+    async def fetch_articles_from_period(self, start_date: date, end_date: date, sources: Optional[List[str]] = None, stats: Optional[dict] = None, incremental: bool = False, progress: ProgressReporter = null_progress, watermarks: Optional[dict] = None) -> List[Article]:
+        """
+        指定期間のRSS記事を収集（フィード単位で並列実行）
+        
+        登録済みの記事はスクレイピング前にスキップし、statsが渡された場合は
+        その件数を stats["skipped_known"] に加算する。
+        incrementalがTrueの場合、フィードのウォーターマーク以前のエントリーは処理しない。
+        進捗イベントは progress に通知する。
+        watermarksが渡された場合、フィードURLごとに記録すべき最新エントリー（GUIDと公開日時）を格納する。
+        ウォーターマークは記事の保存に成功した後で呼び出し側が feed_watermark_store.advance_all で更新する。
+        """
         all_articles = []
         
         print(f"[INFO] Fetching RSS articles from {start_date} to {end_date}")
         if sources:
             print(f"[INFO] Requested sources: {sources}")
         
-        # サービス名をキーとしたYAML構造に対応
-        for service_id, feeds in self.rss_feeds_config.items():
-            if not isinstance(feeds, list):
-                continue
-                
-            for feed_config in feeds:
-                feed_url = feed_config.get("url")
-                source_name = feed_config.get("name", service_id)
-                
-                if not feed_url:
+        # ソースID・表示名のいずれでも指定可能
+        if sources:
+            selected = []
+            for key in sources:
+                source = source_registry.resolve(key)
+                if source is None:
+                    print(f"[WARN] Unknown source: {key}")
+                    progress.emit(EVENT_ERROR, key, error="unknown source")
                     continue
-                
-                # ソースフィルタリング（IDまたは名前で一致）
-                if sources:
-                    # service_id（例: "itmedia"）またはsource_name（例: "ITmedia"）で比較
-                    if service_id not in sources and source_name not in sources:
-                        print(f"[INFO] Skipping {source_name} (service_id: {service_id}) - not in requested sources")
-                        continue
-                
-                try:
-                    print(f"[INFO] Fetching from {source_name} ({feed_url})")
-                    articles = self._fetch_articles_from_feed(feed_url, source_name, start_date, end_date)
-                    all_articles.extend(articles)
-                    print(f"[INFO] Fetched {len(articles)} articles from {source_name}")
-                except Exception as e:
-                    print(f"[ERROR] Failed to fetch from {source_name}: {e}")
+                selected.append(source)
+        else:
+            selected = source_registry.all()
+        
+        targets = [(feed.url, source.name) for source in selected for feed in source.feeds]
+        
+        results = await asyncio.gather(
+            *[self._fetch_articles_from_feed(feed_url, source_name, start_date, end_date, stats, incremental, progress, watermarks) for feed_url, source_name in targets],
+            return_exceptions=True
+        )
+        for (feed_url, source_name), result in zip(targets, results):
+            if isinstance(result, Exception):
+                print(f"[ERROR] Failed to fetch from {source_name}: {result}")
+                continue
+            all_articles.extend(result)
+            print(f"[INFO] Fetched {len(result)} articles from {source_name}")
         
         print(f"[INFO] Total articles fetched: {len(all_articles)}")
         return all_articles
     
-    def _fetch_articles_from_feed(self, feed_url: str, source_name: str, start_date: date, end_date: date) -> List[Article]:
+    async def _fetch_articles_from_feed(
+        self,
+        feed_url: str,
+        source_name: str,
+        start_date: date,
+        end_date: date,
+        stats: Optional[dict] = None,
+        incremental: bool = False,
+        progress: ProgressReporter = null_progress,
+        watermarks: Optional[dict] = None
+    ) -> List[Article]:
         """単一RSSフィードから記事を取得"""
         try:
-            feed = feedparser.parse(feed_url)
-            articles = []
+            print(f"[INFO] Fetching from {source_name} ({feed_url})")
+            # 終了日を含む [開始日 0:00, 終了日翌日 0:00) のタイムゾーン付き範囲で比較
+            start_dt, end_dt = day_range(start_date, end_date)
+            watermark = feed_watermark_store.get(feed_url) if incremental else None
+            since = max(start_dt, watermark.published) if watermark is not None else start_dt
+            
+            feed_entries = await self._fetch_feed(feed_url, since)
+            if feed_entries is None:
+                progress.emit(EVENT_ERROR, source_name, url=feed_url, error="feed fetch failed")
+                return []
+            progress.emit(EVENT_FETCHED, source_name, url=feed_url)
+            progress.emit(EVENT_PARSED, source_name, url=feed_url, entries=len(feed_entries))
+            
+            # 期間フィルタリング
+            entries = [
+                (entry, entry.published_dt) for entry in feed_entries
+                if entry.published_dt and start_dt <= entry.published_dt < end_dt
+            ]
+            
+            newest = newest_processed((entry_guid(entry), published_date) for entry, published_date in entries)
+            
+            # 増分収集: 前回処理した最新エントリー以前はスキップ
+            if watermark is not None:
+                before = len(entries)
+                entries = [(entry, published_date) for entry, published_date in entries if not watermark.is_behind(entry_guid(entry), published_date)]
+                if before > len(entries):
+                    progress.emit(EVENT_SKIPPED, source_name, count=before - len(entries), reason="watermark")
+            
+            # 登録済みの記事はスクレイピング前にスキップ
+            known_urls = await seen_url_index.find_known(entry.link for entry, _ in entries)
+            if known_urls:
+                entries = [(entry, published_date) for entry, published_date in entries if entry.link not in known_urls]
+                print(f"[INFO] Skipped {len(known_urls)} known articles from {source_name}")
+                progress.emit(EVENT_SKIPPED, source_name, count=len(known_urls), reason="known")
+                if stats is not None:
+                    stats["skipped_known"] = stats.get("skipped_known", 0) + len(known_urls)
             
-            for entry in feed.entries:
-                published_date = self._parse_published_date(entry)
-                
-                # 期間フィルタリング
-                if published_date and start_date <= published_date.date() <= end_date:
-                    article = Article(
-                        title=entry.get("title", ""),
-                        url=entry.get("link", ""),
-                        source=source_name,
-                        published=published_date,
-                        content=self._fetch_article_content(entry.get("link", "")),
-                        thumbnail_url=self._fetch_thumbnail_url(entry.get("link", ""))
-                    )
-                    articles.append(article)
+            articles = list(await asyncio.gather(
+                *[self._build_article(entry, published_date, source_name, progress) for entry, published_date in entries]
+            ))
             
+            # 全エントリーの処理に成功した場合のみ記録（保存後に呼び出し側で更新）
+            if watermarks is not None and newest is not None:
+                watermarks[feed_url] = newest
             return articles
             
         except Exception as e:
             print(f"[ERROR] Failed to parse RSS feed {feed_url}: {e}")
+            progress.emit(EVENT_ERROR, source_name, url=feed_url, error=str(e))
             return []
     
-    def _parse_published_date(self, entry) -> Optional[datetime]:
-        """RSS エントリから公開日時をパース"""
-        for date_field in ["published", "updated", "pubDate"]:
-            if hasattr(entry, date_field):
-                try:
-                    date_str = getattr(entry, date_field)
-                    return date_parser.parse(date_str)
-                except:
-                    continue
-        
-        # published_parsed を試す
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            try:
-                import time
-                return datetime.fromtimestamp(time.mktime(entry.published_parsed))
-            except:
-                pass
-        
-        return None
-    
-    def _fetch_article_content(self, url: str) -> str:
-        """記事URLから本文を取得"""
-        if not url:
-            return ""
-        
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, "html.parser")
-                
-                # article タグを優先的に探す
-                article_tag = soup.find("article")
-                if article_tag:
-                    text = article_tag.get_text(separator=" ", strip=True)
-                else:
-                    # article タグがない場合は全体から抽出
-                    # 不要なタグを除去
-                    for tag in soup(["script", "style", "nav", "header", "footer", "aside"]):
-                        tag.decompose()
-                    text = soup.get_text(separator=" ", strip=True)
-                
-                # 改行・タブの正規化
-                return re.sub(r"[\n\t\r]+", " ", text).strip()
-                
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch content from {url}: {e}")
-            return ""
+    async def _build_article(self, entry: FeedEntry, published_date: datetime, source_name: str, progress: ProgressReporter = null_progress) -> Article:
+        """エントリから記事エンティティを作成（本文・サムネイルを1回の取得で抽出）"""
+        link = entry.link
+        page = await scraping_service.fetch_page(link) if link else None
+        progress.emit(EVENT_SCRAPED, source_name, url=link, title=entry.title, has_content=bool(page and page.text))
+        article = Article(
+            title=entry.title,
+            url=link,
+            source=source_name,
+            published=published_date,
+            content=page.text if page else "",
+            thumbnail_url=(page.image_url or "") if page else ""
+        )
+        # 他媒体の同一記事（近似重複）が処理済みなら要約・ラベルを再利用
+        canonical = await asyncio.to_thread(duplicate_index.find, article.content) if article.content else None
+        if canonical:
+            article.summary = canonical.summary
+            article.labels = list(canonical.labels)
+            duplicate_index.record_reuse()
+        return article
     
-    def _fetch_thumbnail_url(self, url: str) -> str:
-        """記事URLからOGP画像を取得"""
-        if not url:
-            return ""
-        
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, "html.parser")
-                
-                # OGP画像を探す
-                og_image = soup.find('meta', property='og:image')
-                if og_image and og_image.get('content'):
-                    return og_image['content']
-                
-                # Twitter画像を探す
-                twitter_image = soup.find('meta', name='twitter:image')
-                if twitter_image and twitter_image.get('content'):
-                    return twitter_image['content']
-                
-                return ""
-                
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch thumbnail from {url}: {e}")
-            return ""
+    async def _fetch_feed(self, feed_url: str, since: Optional[datetime] = None) -> Optional[List[FeedEntry]]:
+        """条件付きGETでフィードを取得してエントリーを逐次解析（取得失敗時はNone）"""
+        result = await feed_cache.fetch(feed_url, timeout=self.timeout)
+        if result is None:
+            return None
+        # XML解析はCPU処理のためスレッドで実行
+        return await asyncio.to_thread(feed_reader.read, feed_url, result.content, since)
     
-    def fetch_latest_articles(self, days: int = 7, sources: Optional[List[str]] = None) -> List[Article]:
+    async def fetch_latest_articles(self, days: int = 7, sources: Optional[List[str]] = None, stats: Optional[dict] = None, incremental: bool = False, progress: ProgressReporter = null_progress, watermarks: Optional[dict] = None) -> List[Article]:
         """最新N日間の記事を取得"""
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
-        return self.fetch_articles_from_period(start_date, end_date, sources)
+        return await self.fetch_articles_from_period(start_date, end_date, sources, stats, incremental, progress, watermarks)
 
 
 # グローバルインスタンス
@@ -0,0 +1,198 @@
+"""
+近似重複記事インデックス
+同じプレスリリースが複数媒体に掲載された記事を fullText のSimHashで検出し、
+正規記事（canonical）の要約・ラベルを再利用してLLM呼び出しを省く
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from adapters.db_adapter import db_adapter
+from utils.simhash import simhash, hamming_distance, bands
+
+
+@dataclass
+class DuplicateEntry:
+    """
+    インデックス登録済みの記事
+
+    :param article_id: 記事ID
+    :param fingerprint: 本文のSimHash指紋
+    :param summary: 要約
+    :param labels: ラベルリスト
+    """
+    article_id: str
+    fingerprint: int
+    summary: str = ""
+    labels: List[str] = field(default_factory=list)
+
+    @property
+    def reusable(self) -> bool:
+        """LLM処理済み（要約・ラベルあり）で再利用できるか"""
+        return bool(self.summary and self.labels)
+
+
+class DuplicateIndex:
+    """本文SimHashのバンド分割による近似重複インデックス"""
+
+    def __init__(self):
+        self.enabled = os.environ.get("DUPLICATE_INDEX_ENABLED", "true").lower() != "false"
+        self.shingle_size = int(os.environ.get("DUPLICATE_SHINGLE_SIZE", "5"))
+        # 近似重複とみなす最大ハミング距離（64bit中）
+        self.max_distance = int(os.environ.get("DUPLICATE_MAX_DISTANCE", "8"))
+        # 短い本文は定型文だけで一致しやすいため対象外
+        self.min_text_length = int(os.environ.get("DUPLICATE_MIN_TEXT_LENGTH", "200"))
+        self.max_articles = int(os.environ.get("DUPLICATE_INDEX_MAX_ARTICLES", "5000"))
+        self.reload_interval = float(os.environ.get("DUPLICATE_INDEX_RELOAD_SECONDS", "3600"))
+        # 距離 max_distance 以下なら max_distance + 1 個のバンドのどれかが必ず一致する
+        self.band_count = max(1, min(self.max_distance + 1, 16))
+        self._entries: Dict[str, DuplicateEntry] = {}
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._loaded_at: Optional[float] = None
+        # 再読み込み中に add された記事（差し替え後のインデックスへ引き継ぐ）
+        self._added_during_load: Optional[Dict[str, DuplicateEntry]] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        self.reused = 0
+
+    def _expired(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval
+
+    def _ensure_loaded(self) -> None:
+        """
+        未ロードまたは期限切れの場合にDBの最新記事から指紋を作成
+
+        DB読み込みと指紋計算はロックの外で新しいインデックスに対して行い、完成後に差し替える。
+        再読み込み中は他のスレッドを待たせず、現在のインデックスをそのまま使わせる。
+        """
+        if not self._expired():
+            return
+        # 初回ロード時のみ完了を待つ
+        if not self._load_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if not self._expired():
+                return
+            with self._lock:
+                self._added_during_load = {}
+            try:
+                rows = db_adapter.get_articles_for_duplicate_index(self.max_articles)
+            except Exception as e:
+                print(f"[WARN] Duplicate index load failed: {e}")
+                with self._lock:
+                    self._added_during_load = None
+                    # 失敗時も一定時間は再試行しない
+                    self._loaded_at = time.monotonic()
+                return
+            entries: Dict[str, DuplicateEntry] = {}
+            buckets: Dict[Tuple[int, int], Set[str]] = {}
+            for row in rows:
+                fingerprint = self._fingerprint(row.get("content") or "")
+                if fingerprint is not None:
+                    self._insert(entries, buckets, DuplicateEntry(row["id"], fingerprint, row.get("summary") or "", list(row.get("labels") or [])))
+            with self._lock:
+                # 読み込み中に登録された記事を引き継ぐ
+                for entry in self._added_during_load.values():
+                    self._insert(entries, buckets, entry)
+                self._entries, self._buckets = entries, buckets
+                self._added_during_load = None
+                self._loaded_at = time.monotonic()
+            print(f"[INFO] Duplicate index loaded: {len(entries)} articles")
+        finally:
+            self._load_lock.release()
+
+    def _fingerprint(self, text: str) -> Optional[int]:
+        if not text or len(text) < self.min_text_length:
+            return None
+        return simhash(text, self.shingle_size)
+
+    def _insert(self, entries: Dict[str, DuplicateEntry], buckets: Dict[Tuple[int, int], Set[str]], entry: DuplicateEntry) -> None:
+        self._remove(entries, buckets, entry.article_id)
+        entries[entry.article_id] = entry
+        for index, band in enumerate(bands(entry.fingerprint, self.band_count)):
+            buckets.setdefault((index, band), set()).add(entry.article_id)
+
+    def _remove(self, entries: Dict[str, DuplicateEntry], buckets: Dict[Tuple[int, int], Set[str]], article_id: str) -> None:
+        entry = entries.pop(article_id, None)
+        if entry is None:
+            return
+        for index, band in enumerate(bands(entry.fingerprint, self.band_count)):
+            bucket = buckets.get((index, band))
+            if bucket is not None:
+                bucket.discard(article_id)
+                if not bucket:
+                    del buckets[(index, band)]
+
+    def find(self, text: str, exclude_id: Optional[str] = None, reusable_only: bool = True) -> Optional[DuplicateEntry]:
+        """
+        本文が近似一致する正規記事を返す（見つからない場合はNone）
+
+        バンドが一致した候補だけハミング距離を計算し、最も近い記事を選ぶ。
+        reusable_only の場合は要約・ラベルを再利用できる記事に限定する。
+        """
+        if not self.enabled:
+            return None
+        fingerprint = self._fingerprint(text)
+        if fingerprint is None:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            self.lookups += 1
+            candidates: Set[str] = set()
+            for index, band in enumerate(bands(fingerprint, self.band_count)):
+                candidates.update(self._buckets.get((index, band), ()))
+            candidates.discard(exclude_id)
+
+            best: Optional[DuplicateEntry] = None
+            best_distance = self.max_distance + 1
+            for article_id in candidates:
+                entry = self._entries[article_id]
+                if reusable_only and not entry.reusable:
+                    continue
+                distance = hamming_distance(fingerprint, entry.fingerprint)
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+            if best is not None:
+                self.matches += 1
+            return best
+
+    def add(self, article_id: str, text: str, summary: str = "", labels: Optional[List[str]] = None) -> None:
+        """記事（LLM処理済みの場合は要約・ラベルも）をインデックスに登録"""
+        if not self.enabled or not article_id:
+            return
+        fingerprint = self._fingerprint(text)
+        if fingerprint is None:
+            return
+        self._ensure_loaded()
+        entry = DuplicateEntry(article_id, fingerprint, summary, list(labels or []))
+        with self._lock:
+            self._insert(self._entries, self._buckets, entry)
+            if self._added_during_load is not None:
+                self._added_during_load[article_id] = entry
+
+    def record_reuse(self) -> None:
+        """正規記事の要約・ラベルを再利用したことを記録"""
+        with self._lock:
+            self.reused += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """インデックスの件数・一致率を取得"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "articles": len(self._entries),
+                "buckets": len(self._buckets),
+                "max_distance": self.max_distance,
+                "lookups": self.lookups,
+                "matches": self.matches,
+                "reused": self.reused,
+                "match_rate": round(self.matches / self.lookups, 3) if self.lookups else 0.0,
+            }
+
+
+# グローバルインスタンス
+duplicate_index = DuplicateIndex()
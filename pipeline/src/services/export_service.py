@@ -21,14 +21,10 @@ class ExportService:
     def generate_topics_template(self, article_ids: List[str], template_type: str = "default") -> Dict[str, Any]:
         """記事群からTOPICS配信テンプレートを生成"""
         try:
-            # 記事データを取得
-            articles_data = []
-            for article_id in article_ids:
-                # 実際の実装では、db_adapter.get_article_by_id() などを使用
-                articles = self.db.get_latest_articles(100)  # 暫定的な実装
-                article = next((a for a in articles if str(a["id"]) == str(article_id)), None)
-                if article:
-                    articles_data.append(article)
+            # 記事データを1回のクエリで取得
+            articles_data, missing_ids = self.db.get_articles_by_ids(article_ids)
+            if missing_ids:
+                print(f"[WARN] Articles not found: {missing_ids}")
             
             if not articles_data:
                 return {"error": "No articles found for the given IDs"}
@@ -41,7 +37,7 @@ class ExportService:
                 title=f"半導体TOPICS配信 - {datetime.now().strftime('%Y年%m月%d日')}",
                 content=template_content,
                 published_date=datetime.now(),
-                article_ids=article_ids,
+                article_ids=[str(article["id"]) for article in articles_data],
                 template=template_type
             )
             
@@ -53,6 +49,7 @@ class ExportService:
                 "title": topic.title,
                 "content": template_content,
                 "article_count": len(articles_data),
+                "missing_ids": missing_ids,
                 "template_type": template_type
             }
             
@@ -0,0 +1,224 @@
+"""
+ストリーミングフィードリーダー
+XMLPullParser で RSS 2.0 / RSS 1.0 / Atom のエントリーを逐次読み出し、収集に必要な項目だけを保持する。
+新しい順に並ぶと分かっているフィードは、開始日時より古いエントリーに達した時点で読み込みを打ち切る。
+XMLとして解析できないフィードは feedparser で解析する
+"""
+import codecs
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import feedparser
+
+from entities.feed_entry import FeedEntry
+from utils.date_parser import feed_date_parser
+
+# エントリー要素（名前空間を除いた要素名）
+ENTRY_TAGS = {"item", "entry"}
+
+MEDIA_NAMESPACE = "http://search.yahoo.com/mrss/"
+
+# 日付フィールドとして扱う要素（名前空間を除いた要素名 → FeedEntryの属性）
+PUBLISHED_TAGS = {"pubDate": "published", "published": "published", "date": "published", "issued": "published"}
+UPDATED_TAGS = {"updated": "updated", "modified": "updated"}
+
+IMG_SRC_PATTERN = re.compile(r'<img[^>]+src="([^"]+)"')
+
+# XML宣言のエンコーディング指定
+XML_ENCODING_PATTERN = re.compile(rb'^\s*<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._-]+)["\']')
+
+# expat が直接扱えるエンコーディング（それ以外は UTF-8 に変換してから解析する）
+EXPAT_ENCODINGS = {"utf-8", "utf-16", "ascii", "iso8859-1"}
+
+FEED_CHUNK_SIZE = 64 * 1024
+
+
+def _split_tag(tag: str):
+    """'{namespace}local' を (namespace, local) に分割"""
+    if tag.startswith("{"):
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+def _text(element: ET.Element) -> str:
+    return (element.text or "").strip()
+
+
+def _build_entry(element: ET.Element) -> FeedEntry:
+    """item / entry 要素から FeedEntry を作成"""
+    entry = FeedEntry()
+    summary = ""
+    content = ""
+    for child in element:
+        namespace, name = _split_tag(child.tag)
+        if namespace == MEDIA_NAMESPACE:
+            if name in ("content", "thumbnail") and entry.image_url is None:
+                media_type = child.get("type") or ("image/" if name == "thumbnail" or child.get("medium") == "image" else "")
+                if media_type.startswith("image/") and child.get("url"):
+                    entry.image_url = child.get("url")
+            continue
+        if name == "title":
+            entry.title = _text(child)
+        elif name == "link":
+            # Atom は rel="alternate"（省略時を含む）の href を優先
+            href = child.get("href")
+            if href:
+                if child.get("rel", "alternate") == "alternate" or not entry.link:
+                    entry.link = href.strip()
+            elif not entry.link:
+                entry.link = _text(child)
+        elif name in ("guid", "id"):
+            entry.id = _text(child)
+        elif name in PUBLISHED_TAGS and entry.published is None:
+            entry.published = _text(child) or None
+        elif name in UPDATED_TAGS and entry.updated is None:
+            entry.updated = _text(child) or None
+        elif name in ("description", "summary"):
+            summary = child.text or ""
+        elif name in ("encoded", "content"):
+            content = child.text or ""
+        elif name == "enclosure" and entry.image_url is None:
+            if (child.get("type") or "").startswith("image/"):
+                entry.image_url = child.get("url")
+
+    entry.summary = (summary or content).strip()
+    if entry.image_url is None:
+        match = IMG_SRC_PATTERN.search(entry.summary)
+        if match:
+            entry.image_url = match.group(1)
+    # RSS 1.0 は rdf:about がGUID
+    if not entry.id:
+        entry.id = element.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about") or entry.link
+    return entry
+
+
+def _to_expat_encoding(content: bytes) -> bytes:
+    """
+    Shift_JIS・EUC-JP 等の expat が扱えないエンコーディングのフィードを UTF-8 に変換
+
+    XML宣言のエンコーディング指定も utf-8 に書き換える。未知のエンコーディングはそのまま返す。
+    """
+    match = XML_ENCODING_PATTERN.match(content)
+    if match is None:
+        return content
+    try:
+        encoding = codecs.lookup(match.group(1).decode("ascii")).name
+    except LookupError:
+        return content
+    if encoding in EXPAT_ENCODINGS:
+        return content
+    start, end = match.span(1)
+    return (content[:start] + b"utf-8" + content[end:]).decode(encoding, errors="replace").encode("utf-8")
+
+
+def iter_xml_entries(content: bytes) -> Iterator[FeedEntry]:
+    """
+    フィードのXMLを逐次解析してエントリーを順に返す
+
+    解析済みのエントリー要素は破棄し、フィード全体のツリーは構築しない。
+    XMLとして不正な場合は xml.etree.ElementTree.ParseError を、
+    扱えないエンコーディングの場合は ValueError を送出する。
+    """
+    content = _to_expat_encoding(content)
+    parser = ET.XMLPullParser(events=("start", "end"))
+    depth = 0
+    for offset in range(0, len(content), FEED_CHUNK_SIZE):
+        parser.feed(content[offset:offset + FEED_CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if _split_tag(element.tag)[1] not in ENTRY_TAGS:
+                continue
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                yield _build_entry(element)
+                element.clear()
+    parser.close()
+
+
+def _feedparser_image(entry) -> Optional[str]:
+    """feedparser のエントリーからサムネイル画像を抽出"""
+    for media in entry.get("media_content", []) or []:
+        if media.get("type", "").startswith("image/"):
+            return media.get("url")
+    for media in entry.get("media_thumbnail", []) or []:
+        if media.get("url"):
+            return media.get("url")
+    for enclosure in entry.get("enclosures", []) or []:
+        if enclosure.get("type", "").startswith("image/"):
+            return enclosure.get("href")
+    match = IMG_SRC_PATTERN.search(entry.get("summary", "") or "")
+    return match.group(1) if match else None
+
+
+def iter_feedparser_entries(content: bytes) -> Iterator[FeedEntry]:
+    """feedparser でフィードを解析してエントリーを順に返す（不正なXMLのフォールバック）"""
+    for entry in feedparser.parse(content).entries:
+        yield FeedEntry(
+            id=entry.get("id", "") or entry.get("link", ""),
+            title=(entry.get("title", "") or "").strip(),
+            link=entry.get("link", "") or "",
+            published=entry.get("published"),
+            updated=entry.get("updated"),
+            summary=entry.get("summary", "") or "",
+            image_url=_feedparser_image(entry),
+        )
+
+
+class FeedReader:
+    """エントリーの並び順をフィードごとに学習し、新しい順のフィードは古いエントリーで読み込みを打ち切るリーダー"""
+
+    def __init__(self):
+        # フィードURL → 新しい順に並んでいるか
+        self._newest_first: Dict[str, bool] = {}
+
+    def read(self, url: str, content: bytes, since: Optional[datetime] = None) -> List[FeedEntry]:
+        """
+        フィードのエントリーを読み出し、公開日時を解析して返す
+
+        :param url: フィードURL（日付形式・並び順の学習キー）
+        :param content: フィード本文
+        :param since: これより古いエントリーは不要（新しい順と分かっているフィードは到達時点で打ち切る）
+        """
+        try:
+            return self._read(url, iter_xml_entries(content), since)
+        except (ET.ParseError, ValueError) as e:
+            print(f"[WARN] Streaming feed parse failed, falling back to feedparser ({url}): {e}")
+            return self._read(url, iter_feedparser_entries(content), since)
+
+    def _read(self, url: str, entries: Iterator[FeedEntry], since: Optional[datetime]) -> List[FeedEntry]:
+        newest_first = self._newest_first.get(url, False)
+        ordered = True
+        previous: Optional[datetime] = None
+        stopped = False
+        result = []
+        for entry in entries:
+            entry.published_dt = feed_date_parser.parse_entry(url, entry)
+            result.append(entry)
+            if entry.published_dt is None:
+                continue
+            if previous is not None and entry.published_dt > previous:
+                ordered = False
+            previous = entry.published_dt
+            if newest_first and ordered and since is not None and entry.published_dt < since:
+                stopped = True
+                break
+
+        # 全件を読んだ場合のみ並び順を確定（途中で打ち切った場合は順序の崩れだけを反映）
+        if not ordered:
+            self._newest_first[url] = False
+        elif not stopped and previous is not None:
+            self._newest_first[url] = True
+        return result
+
+    def is_newest_first(self, url: str) -> Optional[bool]:
+        """学習済みのフィードの並び順（未学習の場合はNone）"""
+        return self._newest_first.get(url)
+
+
+# グローバルインスタンス
+feed_reader = FeedReader()
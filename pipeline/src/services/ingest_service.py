@@ -0,0 +1,70 @@
+"""
+記事ストリーミング登録サービス
+収集した記事を有界キューで受け取り、適応型バッチ送信でExpress APIへ並列に送信する
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from services.batch_sender import AdaptiveBatchSender
+from services.progress import ProgressReporter, null_progress
+
+# キュー終端を表す番兵
+_CLOSE = object()
+
+
+class ArticleIngestor:
+    """収集と並行して記事をExpress APIへ送信するストリーミング登録処理"""
+
+    def __init__(self, progress: ProgressReporter = null_progress):
+        # 部分バッチを送信するまでの待ち時間（秒）
+        self.linger = float(os.environ.get("INGEST_LINGER_SECONDS", "1.0"))
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=int(os.environ.get("INGEST_QUEUE_SIZE", "100")))
+        self._consumer: Optional[asyncio.Task] = None
+        self.sender = AdaptiveBatchSender(progress=progress)
+
+    async def __aenter__(self) -> "ArticleIngestor":
+        self._consumer = asyncio.create_task(self._consume())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def put(self, article: Dict[str, Any]) -> None:
+        """記事をキューに追加（キューが満杯の場合は送信が追いつくまで待機）"""
+        await self._queue.put(article)
+
+    async def close(self) -> Dict[str, Any]:
+        """残りの記事を送信して集計結果を返す"""
+        if self._consumer is not None and not self._consumer.done():
+            await self._queue.put(_CLOSE)
+            await self._consumer
+        return self.result()
+
+    def result(self) -> Dict[str, Any]:
+        """collect-rss 互換の集計結果"""
+        return self.sender.result()
+
+    async def _consume(self) -> None:
+        buffer: List[Dict[str, Any]] = []
+        while True:
+            try:
+                if buffer:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=self.linger)
+                else:
+                    item = await self._queue.get()
+            except asyncio.TimeoutError:
+                # 一定時間新しい記事が来なければ部分バッチを送信
+                while buffer:
+                    await self.sender.submit(self.sender.take_batch(buffer))
+                continue
+
+            if item is _CLOSE:
+                break
+            buffer.append(item)
+            if len(buffer) >= self.sender.batch_size:
+                await self.sender.submit(self.sender.take_batch(buffer))
+
+        while buffer:
+            await self.sender.submit(self.sender.take_batch(buffer))
+        await self.sender.drain()
@@ -0,0 +1,143 @@
+"""
+バックグラウンド収集ジョブ
+収集リクエストをジョブとして登録してIDを即時に返し、
+同時実行数を制限したバックグラウンドタスクで実行する。ジョブは進捗イベントを集計して状態を公開する
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.progress import ProgressReporter, EVENT_ERROR, EVENT_SCRAPED
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+class CrawlJob(ProgressReporter):
+    """収集ジョブ（進捗イベントをソース別・イベント別に集計する）"""
+
+    # 状態に保持するエラーの最大件数
+    MAX_ERRORS = 50
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.counts: Dict[str, int] = {}
+        self.sources: Dict[str, Dict[str, int]] = {}
+        self.errors: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+
+    def emit(self, event: str, source: Optional[str] = None, count: int = 1, **data: Any) -> None:
+        self.counts[event] = self.counts.get(event, 0) + count
+        if source is not None:
+            progress = self.sources.setdefault(source, {})
+            progress[event] = progress.get(event, 0) + count
+        if event == EVENT_ERROR and len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(f"{source or '-'}: {data.get('error', '')}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ジョブ状態をAPIレスポンス用の辞書に変換"""
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(elapsed, 2),
+            "counts": self.counts,
+            # スクレイピング済み記事数/秒
+            "throughput": round(self.counts.get(EVENT_SCRAPED, 0) / elapsed, 2) if elapsed else 0.0,
+            "sources": self.sources,
+            "errors": self.errors,
+            "result": self.result,
+        }
+
+
+class JobService:
+    """同時実行数を制限したバックグラウンドジョブの実行・管理"""
+
+    def __init__(self):
+        self.max_concurrent = int(os.environ.get("CRAWL_JOB_MAX_CONCURRENCY", "2"))
+        self.max_history = int(os.environ.get("CRAWL_JOB_HISTORY", "100"))
+        self._semaphore = asyncio.Semaphore(max(1, self.max_concurrent))
+        self._jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, kind: str, params: Dict[str, Any], run: Callable[[CrawlJob], Awaitable[Dict[str, Any]]]) -> CrawlJob:
+        """
+        ジョブを登録してバックグラウンドで実行
+
+        :param kind: ジョブ種別（"crawl" / "collect-rss" など）
+        :param params: リクエストパラメータ（状態表示用）
+        :param run: ジョブを進捗通知先として受け取り、結果を返すコルーチン関数
+        """
+        job = CrawlJob(kind, params)
+        self._jobs[job.id] = job
+        self._trim_history()
+        task = asyncio.create_task(self._run(job, run))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        print(f"[INFO] Job queued: {job.id} ({kind})")
+        return job
+
+    async def _run(self, job: CrawlJob, run: Callable[[CrawlJob], Awaitable[Dict[str, Any]]]) -> None:
+        try:
+            async with self._semaphore:
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                job.result = await run(job)
+                job.status = JOB_COMPLETED
+        except asyncio.CancelledError:
+            job.status = JOB_CANCELLED
+            raise
+        except Exception as e:
+            print(f"[ERROR] Job {job.id} failed: {e}")
+            job.status = JOB_FAILED
+            job.emit(EVENT_ERROR, error=str(e))
+        finally:
+            job.finished_at = time.time()
+            print(f"[INFO] Job {job.status}: {job.id} ({job.kind})")
+
+    def _trim_history(self) -> None:
+        """保持件数を超えた終了済みジョブを古い順に削除"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_history:
+                break
+            if self._jobs[job_id].status not in (JOB_QUEUED, JOB_RUNNING):
+                del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        """ジョブを取得"""
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[CrawlJob]:
+        """ジョブを新しい順に取得"""
+        return list(reversed(self._jobs.values()))
+
+    async def shutdown(self) -> None:
+        """実行中・待機中のジョブをキャンセル（lifespan終了時に呼び出す）"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            print(f"[INFO] Cancelled {len(tasks)} background jobs")
+
+
+# シングルトンインスタンス
+job_service = JobService()
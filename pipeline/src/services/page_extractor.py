@@ -0,0 +1,120 @@
+"""
+記事ページ抽出処理
+HTML解析・本文抽出・テキスト正規化を行う純粋関数群。
+プロセスプールのワーカーから呼び出せるよう、モジュールレベル関数として定義する
+"""
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+from entities.page_content import PageContent
+
+# 本文抽出時に削除する要素
+REMOVE_TAGS = ['script', 'style', 'header', 'footer', 'nav']
+
+# 本文コンテナの候補（優先順）
+CONTENT_CONTAINER_PATTERN = re.compile(r'(content|article|main|post)')
+CONTENT_TAGS = [
+    ('article', {}),
+    ('div', {'class': CONTENT_CONTAINER_PATTERN}),
+    ('div', {'id': CONTENT_CONTAINER_PATTERN}),
+    ('main', {}),
+]
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+MAX_TEXT_LENGTH = 5000
+
+
+def default_parser() -> str:
+    """利用可能な最速のHTMLパーサーを返す（lxmlがなければhtml.parser）"""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+def extract_page(url: str, html: bytes, parser: str = "html.parser") -> PageContent:
+    """HTMLを1回だけ解析して本文・画像・メタデータを抽出"""
+    soup = BeautifulSoup(html, parser)
+
+    # メタデータは本文抽出で要素を削除する前に取得
+    page = PageContent(
+        url=url,
+        image_url=_extract_og_image(soup),
+        title=_extract_meta(soup, "og:title") or (soup.title.get_text(strip=True) if soup.title else None),
+        description=_extract_meta(soup, "og:description") or _extract_meta(soup, "description"),
+        canonical_url=_extract_canonical_url(soup),
+    )
+
+    # 記事本文の抽出
+    page.text = _extract_article_text(soup)
+    return page
+
+
+def _extract_article_text(soup: BeautifulSoup) -> str:
+    """記事本文を抽出"""
+    # 不要な要素を削除
+    for element in soup.find_all(REMOVE_TAGS):
+        element.decompose()
+
+    text = ""
+    for name, attrs in CONTENT_TAGS:
+        element = soup.find(name, attrs)
+        if element:
+            text = element.get_text(separator=" ", strip=True)
+            break
+
+    # 見つからない場合は全体のテキストを取得
+    if not text:
+        text = soup.get_text(separator=" ", strip=True)
+
+    # 改行・タブを含む連続空白を正規化
+    text = WHITESPACE_PATTERN.sub(' ', text)
+
+    # 長すぎる場合は最初の部分のみ
+    if len(text) > MAX_TEXT_LENGTH:
+        text = text[:MAX_TEXT_LENGTH] + "..."
+
+    return text.strip()
+
+
+def _extract_og_image(soup: BeautifulSoup) -> Optional[str]:
+    """OGP画像URLを抽出"""
+    # OGP画像を探す
+    og_image = soup.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        return og_image["content"]
+
+    # Twitter Card画像を探す
+    twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
+    if twitter_image and twitter_image.get("content"):
+        return twitter_image["content"]
+
+    # 通常の画像タグから最初の画像を取得
+    img_tag = soup.find("img", src=True)
+    if img_tag and img_tag["src"]:
+        src = img_tag["src"]
+        # 相対URLの場合は処理をスキップ（簡易実装）
+        if src.startswith("http"):
+            return src
+
+    return None
+
+
+def _extract_meta(soup: BeautifulSoup, key: str) -> Optional[str]:
+    """meta タグ（property または name）の content を取得"""
+    meta = soup.find("meta", property=key) or soup.find("meta", attrs={"name": key})
+    if meta and meta.get("content"):
+        return meta["content"].strip()
+    return None
+
+
+def _extract_canonical_url(soup: BeautifulSoup) -> Optional[str]:
+    """正規URLを取得"""
+    link = soup.find("link", rel="canonical", href=True)
+    if link and link["href"].startswith("http"):
+        return link["href"]
+    return _extract_meta(soup, "og:url")
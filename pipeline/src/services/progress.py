@@ -0,0 +1,43 @@
+"""
+収集進捗の通知
+フィード取得・解析・スクレイピング・保存・スキップなどの進捗イベントを通知先へ渡す
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+# 進捗イベント種別
+EVENT_FETCHED = "fetched"
+EVENT_PARSED = "parsed"
+EVENT_SCRAPED = "scraped"
+EVENT_SAVED = "saved"
+EVENT_SKIPPED = "skipped"
+EVENT_ERROR = "error"
+
+
+class ProgressReporter:
+    """進捗イベントの通知先（既定では何もしない）"""
+
+    def emit(self, event: str, source: Optional[str] = None, count: int = 1, **data: Any) -> None:
+        """
+        進捗イベントを通知
+
+        :param event: イベント種別（EVENT_* のいずれか）
+        :param source: ソース名（ソースに紐づかないイベントの場合はNone）
+        :param count: イベントの対象件数
+        :param data: イベントの付加情報（URL、タイトル、エラー内容など）
+        """
+
+
+class QueueProgressReporter(ProgressReporter):
+    """進捗イベントを辞書に変換してキューへ積む通知先（ストリーミング応答用）"""
+
+    def __init__(self):
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    def emit(self, event: str, source: Optional[str] = None, count: int = 1, **data: Any) -> None:
+        self.queue.put_nowait({"event": event, "source": source, "count": count, "ts": time.time(), **data})
+
+
+# 通知先を指定しない場合に使う何もしない通知先
+null_progress = ProgressReporter()
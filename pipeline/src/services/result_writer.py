@@ -0,0 +1,197 @@
+"""
+LLM処理結果のバッファ書き込み
+要約・ラベルの更新をメモリに溜め、件数または経過時間で
+UPDATE ... FROM (VALUES ...) の1文にまとめてDBへ書き戻す
+"""
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import psycopg
+
+from adapters.db_adapter import db_adapter, ALLOWED_UPDATE_FIELDS
+
+# 1文で更新する最大行数（バインドパラメータ数の上限対策）
+MAX_ROWS_PER_STATEMENT = 1000
+
+# flush の呼び出し元へ返すまで保持する書き込み失敗の最大件数
+MAX_TRACKED_FAILURES = 1000
+
+
+class ArticleResultWriter:
+    """記事フィールド更新のバッファ付き一括書き込み"""
+
+    def __init__(self):
+        # この件数が溜まったら即座に書き込む
+        self.batch_size = int(os.environ.get("RESULT_WRITER_BATCH_SIZE", "50"))
+        # 件数に達しなくてもこの間隔（ミリ秒）で書き込む
+        self.flush_interval = float(os.environ.get("RESULT_WRITER_FLUSH_MS", "500")) / 1000
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # 書き込みに失敗した記事ID → エラー内容（flush の呼び出し元が受け取るまで保持）
+        self._failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+
+    def write(self, article_id: str, **fields: Any) -> None:
+        """
+        記事の更新内容をバッファに追加（同じ記事への更新は後勝ちでまとめる）
+
+        例: write(article_id, summary=summary, labels=labels)
+        """
+        if not fields:
+            return
+        for field_name in fields:
+            if field_name not in ALLOWED_UPDATE_FIELDS:
+                raise ValueError(f"Field '{field_name}' is not allowed for update")
+        with self._lock:
+            self._pending.setdefault(str(article_id), {}).update(fields)
+            pending = len(self._pending)
+            self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR] Result writer flush failed: {e}")
+
+    def flush(self, article_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        バッファ内の更新をすべて書き込む
+
+        article_ids を指定した場合、そのうち書き込めなかった記事を {記事ID: エラー内容} で返す。
+        対象は不正な値で書き込みに失敗した記事（バックグラウンドの書き込みで失敗したものを含む）と、
+        DBに接続できずバッファに残った記事（次回の書き込みで再試行される）。
+        """
+        with self._flush_lock:
+            self._flush_pending()
+            if article_ids is None:
+                return {}
+            unwritten = {}
+            with self._lock:
+                for article_id in map(str, article_ids):
+                    if article_id in self._failures:
+                        unwritten[article_id] = self._failures.pop(article_id)
+                    elif article_id in self._pending:
+                        unwritten[article_id] = "write deferred: database unavailable"
+            return unwritten
+
+    def _flush_pending(self) -> int:
+        """バッファ内の更新を書き込み、更新件数を返す（_flush_lock を保持して呼び出す）"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        # 更新するフィールドの組み合わせごとに1文にまとめる
+        groups: Dict[Tuple[str, ...], List[tuple]] = {}
+        for article_id, fields in pending.items():
+            field_names = tuple(sorted(fields))
+            groups.setdefault(field_names, []).append(
+                (article_id, *(fields[name] for name in field_names))
+            )
+
+        written = 0
+        for field_names, rows in groups.items():
+            for offset in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+                written += self._write_rows(list(field_names), rows[offset:offset + MAX_ROWS_PER_STATEMENT])
+        self.flushes += 1
+        self.written += written
+        return written
+
+    def _write_rows(self, field_names: List[str], rows: List[tuple]) -> int:
+        """1文で書き込む（失敗時は半分に分割して再試行し、不正な行だけを除外）"""
+        try:
+            written = db_adapter.bulk_update_articles(field_names, rows)
+        except psycopg.OperationalError as e:
+            # DBに接続できない場合は捨てずにバッファへ戻して次回再試行
+            print(f"[WARN] Result writer deferred {len(rows)} updates: {e}")
+            self._requeue(field_names, rows)
+            return 0
+        except Exception as e:
+            if len(rows) == 1:
+                print(f"[ERROR] Result writer dropped update for {rows[0][0]}: {e}")
+                self.failed += 1
+                self._record_failure(rows[0][0], str(e))
+                return 0
+            middle = len(rows) // 2
+            return self._write_rows(field_names, rows[:middle]) + self._write_rows(field_names, rows[middle:])
+        with self._lock:
+            # 以前の失敗は新しい書き込みで解消済み
+            for row in rows:
+                self._failures.pop(row[0], None)
+        return written
+
+    def _record_failure(self, article_id: str, error: str) -> None:
+        with self._lock:
+            self._failures.pop(article_id, None)
+            self._failures[article_id] = error
+            # 受け取られないまま溜まった古い失敗から捨てる
+            while len(self._failures) > MAX_TRACKED_FAILURES:
+                del self._failures[next(iter(self._failures))]
+
+    def _requeue(self, field_names: List[str], rows: List[tuple]) -> None:
+        with self._lock:
+            for article_id, *values in rows:
+                # 失敗中に届いた新しい更新を優先する
+                fields = dict(zip(field_names, values))
+                fields.update(self._pending.get(article_id, {}))
+                self._pending[article_id] = fields
+
+    def close(self) -> Dict[str, str]:
+        """
+        書き込みスレッドを止め、残りの更新をすべて書き込む（終了時に呼び出す）
+
+        書き込めなかった記事（DBに接続できずバッファに残った記事と、flush で受け取られていない
+        書き込み失敗）を {記事ID: エラー内容} で返し、記事IDをログに出力する。
+        """
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        with self._flush_lock:
+            written = self._flush_pending()
+            with self._lock:
+                unwritten = dict(self._failures)
+                self._failures.clear()
+                for article_id in self._pending:
+                    unwritten[article_id] = "write deferred: database unavailable"
+        if unwritten:
+            print(f"[ERROR] Result writer could not write {len(unwritten)} updates on shutdown: {', '.join(unwritten)}")
+        elif written:
+            print(f"[INFO] Result writer flushed {written} updates on shutdown")
+        return unwritten
+
+    def get_stats(self) -> Dict[str, Any]:
+        """バッファ・書き込み件数の統計を取得"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+
+# グローバルインスタンス
+result_writer = ArticleResultWriter()
@@ -2,111 +2,175 @@
 記事本文スクレイピングサービス
 RSSフィードから取得したURLから記事本文とOGP画像を取得
 """
-import re
-import httpx
-from bs4 import BeautifulSoup
+import os
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import aiohttp
 from typing import Optional, Tuple
-from tenacity import retry, stop_after_attempt, wait_fixed
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from adapters.http_client import http_client
+from adapters.host_scheduler import host_scheduler
+from adapters.host_health import host_health, is_retryable_error, CircuitOpenError
+from adapters.page_cache import page_cache
+from entities.page_content import PageContent
+from services import page_extractor
+
+
+READ_CHUNK_SIZE = 64 * 1024
 
 
 class ScrapingService:
     """記事コンテンツスクレイピングサービス"""
     
+    # 抽出ロジックを変更したら上げる（キャッシュ済みHTMLから再抽出される）
+    EXTRACTOR_VERSION = 1
+    
     def __init__(self):
-        self.timeout = httpx.Timeout(10.0, connect=5.0)
+        self.timeout = aiohttp.ClientTimeout(total=10.0, connect=5.0)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        # HTML解析用プロセスプール（0の場合はプールを使わずワーカースレッドで解析）
+        self.parse_workers = int(os.environ.get("SCRAPER_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.parser = os.environ.get("SCRAPER_HTML_PARSER") or page_extractor.default_parser()
+        # 再試行はタイムアウト・接続エラー・5xx/429 のみ（ジッター付き指数バックオフ）
+        self.max_attempts = int(os.environ.get("SCRAPER_MAX_ATTEMPTS", "3"))
+        # 1ページあたりのダウンロード上限（バイト）
+        self.max_bytes = int(os.environ.get("SCRAPER_MAX_BYTES", str(1024 * 1024)))
+        self._executor: Optional[ProcessPoolExecutor] = None
     
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
-    async def fetch_article_content(self, url: str) -> Tuple[str, Optional[str]]:
+    async def fetch_page(self, url: str) -> PageContent:
         """
-        記事URLから本文とOGP画像を取得
+        記事ページを1回だけダウンロード・解析し、本文と画像・メタデータをまとめて取得
         
         Returns:
-            Tuple[str, Optional[str]]: (記事本文, OGP画像URL)
+            PageContent: 抽出結果（取得失敗時は本文が空）
         """
-        content = ""
-        og_image = None
+        page = PageContent(url=url)
+        
+        # ページキャッシュから読み出し（抽出ロジックが古い場合は保存済みHTMLから再抽出）
+        # SQLiteアクセスと圧縮・展開はイベントループを止めないようスレッドで実行
+        cached = await asyncio.to_thread(page_cache.get, url, self.EXTRACTOR_VERSION)
+        if cached is not None:
+            if cached.extractor_version == self.EXTRACTOR_VERSION:
+                return cached.page
+            page = await self.extract_page(url, cached.html)
+            await asyncio.to_thread(page_cache.put, url, cached.html, page, self.EXTRACTOR_VERSION)
+            return page
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, "html.parser")
-                
-                # 記事本文の抽出
-                content = self._extract_article_text(soup)
-                
-                # OGP画像の取得
-                og_image = self._extract_og_image(soup)
-                
+            html = await self._download(url)
+        except CircuitOpenError as e:
+            print(f"[WARN] スクレイピングをスキップ ({url}): {e}")
+            return page
         except Exception as e:
-            print(f"[ERROR] スクレイピング失敗 ({url}): {e}")
+            print(f"[ERROR] スクレイピング失敗 ({url}): {e!r}")
+            return page
         
-        return content, og_image
+        page = await self.extract_page(url, html)
+        await asyncio.to_thread(page_cache.put, url, html, page, self.EXTRACTOR_VERSION)
+        return page
     
-    def _extract_article_text(self, soup: BeautifulSoup) -> str:
-        """記事本文を抽出"""
-        # 不要な要素を削除
-        for element in soup.find_all(['script', 'style', 'header', 'footer', 'nav']):
-            element.decompose()
-        
-        # 優先的に探すタグ
-        content_tags = [
-            'article',
-            ('div', {'class': re.compile(r'(content|article|main|post)')}),
-            ('div', {'id': re.compile(r'(content|article|main|post)')}),
-            'main'
-        ]
-        
-        text = ""
-        for tag in content_tags:
-            if isinstance(tag, tuple):
-                element = soup.find(tag[0], tag[1])
-            else:
-                element = soup.find(tag)
-            
-            if element:
-                text = element.get_text(separator=" ", strip=True)
+    async def _download(self, url: str) -> bytes:
+        """再試行可能なエラーのみジッター付きバックオフで再試行してダウンロード"""
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=4),
+            retry=retry_if_exception(is_retryable_error),
+            reraise=True,
+        )
+        async for attempt in retrying:
+            with attempt:
+                return await self._download_once(url)
+    
+    async def _download_once(self, url: str) -> bytes:
+        """ホストの健全性を確認して1回ダウンロードし、レイテンシ・障害を記録"""
+        trial = host_health.check(url)
+        timeout = host_health.timeout_for(url, self.timeout)
+        session = http_client.get_session()
+        async with host_scheduler.slot(url):
+            # 枠の待機中に他のリクエストでサーキットが開いた場合はここで打ち切る
+            # （半開状態の試行を許可されたリクエスト自身は再確認しない）
+            if not trial:
+                host_health.check(url)
+            # スケジューラの待ち時間を含めないよう枠の確保後に計測
+            started = time.monotonic()
+            try:
+                async with session.get(url, headers=self.headers, timeout=timeout) as response:
+                    response.raise_for_status()
+                    html = await self._read_capped(response)
+            except Exception as e:
+                if is_retryable_error(e):
+                    host_health.record_failure(url, e)
+                else:
+                    # 404等はホスト自体は応答しているため障害として扱わない
+                    host_health.record_success(url, time.monotonic() - started)
+                raise
+        host_health.record_success(url, time.monotonic() - started)
+        return html
+    
+    async def _read_capped(self, response: aiohttp.ClientResponse) -> bytes:
+        """
+        レスポンス本文を上限バイト数までストリーミングで読み込む
+
+        関連記事カードや入れ子の <article> で本文が途中で切れないよう、終了タグでは打ち切らない。
+        """
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            if size + len(chunk) > self.max_bytes:
+                chunks.append(chunk[:self.max_bytes - size])
+                size = self.max_bytes
                 break
-        
-        # 見つからない場合は全体のテキストを取得
-        if not text:
-            text = soup.get_text(separator=" ", strip=True)
-        
-        # 改行や余分な空白を正規化
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[\n\t\r]+', ' ', text)
-        
-        # 長すぎる場合は最初の部分のみ
-        if len(text) > 5000:
-            text = text[:5000] + "..."
-        
-        return text.strip()
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks)
     
-    def _extract_og_image(self, soup: BeautifulSoup) -> Optional[str]:
-        """OGP画像URLを抽出"""
-        # OGP画像を探す
-        og_image = soup.find("meta", property="og:image")
-        if og_image and og_image.get("content"):
-            return og_image["content"]
-        
-        # Twitter Card画像を探す
-        twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
-        if twitter_image and twitter_image.get("content"):
-            return twitter_image["content"]
+    async def fetch_article_content(self, url: str) -> Tuple[str, Optional[str]]:
+        """
+        記事URLから本文とOGP画像を取得
         
-        # 通常の画像タグから最初の画像を取得
-        img_tag = soup.find("img", src=True)
-        if img_tag and img_tag["src"]:
-            src = img_tag["src"]
-            # 相対URLの場合は処理をスキップ（簡易実装）
-            if src.startswith("http"):
-                return src
+        Returns:
+            Tuple[str, Optional[str]]: (記事本文, OGP画像URL)
+        """
+        page = await self.fetch_page(url)
+        return page.text, page.image_url
+    
+    async def extract_page(self, url: str, html: bytes) -> PageContent:
+        """ダウンロード済みHTMLをイベントループ外（プロセスプール）で解析して本文・画像・メタデータを抽出"""
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(page_extractor.extract_page, url, html, self.parser)
         
-        return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, page_extractor.extract_page, url, html, self.parser)
+        except BrokenProcessPool:
+            # ワーカーが異常終了した場合はプールを作り直し、今回はスレッドで解析
+            print("[WARN] HTML解析プロセスプールが停止したため再作成します")
+            self.shutdown()
+            return await asyncio.to_thread(page_extractor.extract_page, url, html, self.parser)
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """HTML解析用プロセスプールを取得（初回呼び出し時に作成）"""
+        if self._executor is None and self.parse_workers > 0:
+            # イベントループやスレッドを持つ親プロセスをforkしないようspawnで起動
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            print(f"[INFO] HTML parse pool started (workers={self.parse_workers}, parser={self.parser})")
+        return self._executor
+    
+    def shutdown(self) -> None:
+        """HTML解析用プロセスプールを停止"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
 
 # シングルトンインスタンス
@@ -0,0 +1,70 @@
+"""
+既知記事URLインデックス
+スクレイピング前に登録済み記事を判定し、既知の記事はネットワークI/Oの前にスキップする
+"""
+import asyncio
+import os
+import time
+from typing import Iterable, Optional, Set
+
+from adapters.db_adapter import db_adapter
+from utils.url_utils import normalize_url
+
+
+class SeenUrlIndex:
+    """Article."articleUrl" から作るメモリ上の既知URLインデックス（DB照会フォールバック付き）"""
+
+    def __init__(self):
+        self.enabled = os.environ.get("SEEN_URL_INDEX_ENABLED", "true").lower() != "false"
+        self.reload_interval = float(os.environ.get("SEEN_URL_INDEX_RELOAD_SECONDS", "3600"))
+        self._urls: Set[str] = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_loaded(self) -> None:
+        """未ロードまたは期限切れの場合にDBから全URLをロード"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.reload_interval:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.reload_interval:
+                return
+            try:
+                urls = await asyncio.to_thread(db_adapter.get_all_article_urls)
+                self._urls = {normalize_url(url) for url in urls if url}
+                self._loaded_at = time.monotonic()
+                print(f"[INFO] Seen URL index loaded: {len(self._urls)} urls")
+            except Exception as e:
+                print(f"[WARN] Seen URL index load failed: {e}")
+
+    def add(self, urls: Iterable[str]) -> None:
+        """登録済みになったURLをインデックスに追加"""
+        self._urls.update(normalize_url(url) for url in urls if url)
+
+    async def find_known(self, urls: Iterable[str]) -> Set[str]:
+        """
+        指定URLのうち登録済みのものを返す
+
+        メモリ上のインデックスで判定し、見つからなかったURLはDBへ一括照会して
+        前回ロード以降に他経路（Express API等）で登録された記事も検出する。
+        """
+        urls = [url for url in urls if url]
+        if not self.enabled or not urls:
+            return set()
+
+        await self._ensure_loaded()
+        known = {url for url in urls if normalize_url(url) in self._urls}
+
+        remaining = [url for url in urls if url not in known]
+        if remaining:
+            try:
+                existing = await asyncio.to_thread(db_adapter.find_existing_article_urls, remaining)
+                self.add(existing)
+                known.update(existing)
+            except Exception as e:
+                print(f"[WARN] Seen URL lookup failed: {e}")
+
+        return known
+
+
+# グローバルインスタンス
+seen_url_index = SeenUrlIndex()
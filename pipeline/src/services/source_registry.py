@@ -0,0 +1,134 @@
+"""
+収集ソースレジストリ
+rss_feeds.yaml を一度だけ読み込んで検証し、ソースID・表示名・ホスト名で引けるよう索引化する。
+ファイルの更新時刻（mtime）が変わった場合のみ再読み込みする
+"""
+import os
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import yaml
+
+from entities.source import FeedDefinition, SourceDefinition
+
+
+class SourceRegistryError(Exception):
+    """rss_feeds.yaml の内容が不正"""
+
+
+class SourceRegistry:
+    """rss_feeds.yaml から構築する収集ソースの索引（mtime変更時のみ再読み込み）"""
+
+    def __init__(self):
+        self.path = self._find_path()
+        self._mtime: Optional[float] = None
+        self._sources: List[SourceDefinition] = []
+        self._by_id: Dict[str, SourceDefinition] = {}
+        self._by_name: Dict[str, SourceDefinition] = {}
+        self._by_host: Dict[str, List[SourceDefinition]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _find_path() -> Optional[str]:
+        """rss_feeds.yaml の場所を探す（RSS_FEEDS_PATH が指定されていれば優先）"""
+        possible_paths = [
+            os.environ.get("RSS_FEEDS_PATH", ""),
+            os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "rss_feeds.yaml")),
+            "rss_feeds.yaml",
+            "src/rss_feeds.yaml",
+            "/app/src/rss_feeds.yaml"  # Docker環境用
+        ]
+        for path in possible_paths:
+            if path and os.path.exists(path):
+                return path
+        print(f"[ERROR] rss_feeds.yaml not found in any of: {[p for p in possible_paths if p]}")
+        return None
+
+    @staticmethod
+    def _parse(config) -> List[SourceDefinition]:
+        """YAMLを検証してソース定義のリストに変換"""
+        if not isinstance(config, dict) or not isinstance(config.get("sources"), dict):
+            raise SourceRegistryError("'sources' mapping is required")
+
+        sources = []
+        seen_ids = set()
+        for name, body in config["sources"].items():
+            if not isinstance(body, dict):
+                raise SourceRegistryError(f"source '{name}' must be a mapping")
+            source_id = str(body.get("id") or name)
+            if source_id in seen_ids:
+                raise SourceRegistryError(f"duplicate source id '{source_id}'")
+            seen_ids.add(source_id)
+
+            feeds = []
+            for feed in body.get("feeds") or []:
+                url = feed.get("url") if isinstance(feed, dict) else None
+                if not url or urlparse(url).scheme not in ("http", "https"):
+                    raise SourceRegistryError(f"source '{name}' has an invalid feed url: {feed!r}")
+                feeds.append(FeedDefinition(url=url, category=feed.get("category") or "general"))
+            if not feeds:
+                print(f"[WARN] Source '{name}' has no feeds")
+
+            sources.append(SourceDefinition(id=source_id, name=str(name), feeds=feeds))
+        return sources
+
+    def _reload_if_changed(self) -> None:
+        """ファイルの更新時刻が変わっていれば再読み込み（不正な内容の場合は前回の定義を維持）"""
+        if self.path is None:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            print(f"[ERROR] Failed to stat {self.path}: {e}")
+            return
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    sources = self._parse(yaml.safe_load(f))
+            except Exception as e:
+                print(f"[ERROR] Failed to load {self.path}: {e}")
+                # 同じ内容で再試行し続けないよう、失敗した版のmtimeも記録する
+                self._mtime = mtime
+                return
+
+            by_host: Dict[str, List[SourceDefinition]] = {}
+            for source in sources:
+                for host in {urlparse(feed.url).hostname for feed in source.feeds}:
+                    by_host.setdefault(host, []).append(source)
+
+            self._sources = sources
+            self._by_id = {source.id: source for source in sources}
+            self._by_name = {source.name: source for source in sources}
+            self._by_host = by_host
+            self._mtime = mtime
+            print(f"[INFO] Loaded RSS feeds from: {self.path} ({len(sources)} sources)")
+
+    def all(self) -> List[SourceDefinition]:
+        """全ソースを定義順で取得"""
+        self._reload_if_changed()
+        return list(self._sources)
+
+    def resolve(self, key: str) -> Optional[SourceDefinition]:
+        """ソースID・表示名・ホスト名（またはURL）のいずれかでソースを取得"""
+        self._reload_if_changed()
+        source = self._by_id.get(key) or self._by_name.get(key)
+        if source is not None:
+            return source
+        host = urlparse(key).hostname if "://" in key else key.lower()
+        matches = self._by_host.get(host or "")
+        return matches[0] if matches else None
+
+    def find_by_host(self, host: str) -> List[SourceDefinition]:
+        """フィードのホスト名からソースを取得"""
+        self._reload_if_changed()
+        return list(self._by_host.get(host.lower(), []))
+
+
+# グローバルインスタンス
+source_registry = SourceRegistry()
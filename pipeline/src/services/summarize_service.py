@@ -1,9 +1,11 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from entities.article import Article
 from adapters.db_adapter import db_adapter
 from adapters.llm_adapter import llm_adapter
+from services.duplicate_index import duplicate_index, DuplicateEntry
+from services.result_writer import result_writer
 
 
 class SummarizeService:
@@ -12,6 +14,41 @@ class SummarizeService:
     def __init__(self):
         self.db = db_adapter
         self.llm = llm_adapter
+        self.duplicates = duplicate_index
+        self.writer = result_writer
+    
+    def reuse_duplicate_summary(self, article_id: str, content: str, include_labeling: bool = True) -> Optional[DuplicateEntry]:
+        """
+        本文が近似一致する処理済み記事があれば、その要約・ラベルをコピーしてLLM呼び出しを省く
+
+        :return: 再利用した正規記事（見つからない場合はNone）
+        """
+        canonical = self.duplicates.find(content, exclude_id=article_id)
+        if canonical is None:
+            return None
+        if include_labeling:
+            self.writer.write(article_id, summary=canonical.summary, labels=canonical.labels)
+        else:
+            self.writer.write(article_id, summary=canonical.summary)
+        self.duplicates.record_reuse()
+        print(f"[INFO] Reused summary of duplicate article: {article_id} -> {canonical.article_id}")
+        return canonical
+    
+    def _flush_writes(self, buffered: Dict[str, bool], processed: int, reused: int, errors: int):
+        """
+        バッファした書き込みを実行し、DBに書き込めなかった記事を processed・reused から errors へ移す
+
+        :param buffered: 書き込みをバッファした記事ID → 重複記事の再利用かどうか
+        :return: (processed, reused, errors)
+        """
+        unwritten = self.writer.flush(buffered)
+        for article_id, error in unwritten.items():
+            print(f"[ERROR] Failed to write article {article_id}: {error}")
+            processed -= 1
+            errors += 1
+            if buffered[article_id]:
+                reused -= 1
+        return processed, reused, errors
     
     def summarize_articles(self, limit: int = 50, include_labeling: bool = True, model_name: str = "claude-3-haiku-20240307") -> Dict[str, Any]:
         """要約されていない記事を処理"""
@@ -24,6 +61,9 @@ class SummarizeService:
             
             processed = 0
             errors = 0
+            reused = 0
+            # 書き込みをバッファした記事ID → 重複記事の再利用かどうか
+            buffered: Dict[str, bool] = {}
             
             for article in articles:
                 try:
@@ -32,25 +72,34 @@ class SummarizeService:
                     if not content.strip():
                         continue
                     
+                    # 近似重複記事が処理済みなら要約・ラベルを再利用
+                    if self.reuse_duplicate_summary(article["id"], article.get("content") or ""):
+                        reused += 1
+                        processed += 1
+                        buffered[str(article["id"])] = True
+                        continue
+                    
                     summary, labels = self.llm.generate_summary_and_labels(content)
                     
-                    # データベースを更新
-                    self.db.update_article_summary_and_labels(
-                        article["id"], 
-                        summary, 
-                        labels
-                    )
+                    # データベースへの書き込みはバッファしてまとめて実行
+                    self.writer.write(article["id"], summary=summary, labels=labels)
+                    # 同じバッチ内の後続の重複記事が再利用できるよう登録
+                    self.duplicates.add(article["id"], article.get("content") or "", summary, labels)
                     
                     processed += 1
+                    buffered[str(article["id"])] = False
                     print(f"[INFO] Processed article: {article['title'][:50]}...")
                     
                 except Exception as e:
                     print(f"[ERROR] Failed to process article {article.get('id')}: {e}")
                     errors += 1
             
+            processed, reused, errors = self._flush_writes(buffered, processed, reused, errors)
+            
             return {
                 "message": f"Summarization completed",
                 "processed": processed,
+                "reused": reused,
                 "errors": errors,
                 "total_found": len(articles)
             }
@@ -63,16 +112,18 @@ class SummarizeService:
         """特定の記事を要約処理"""
         processed = 0
         errors = 0
+        reused = 0
+        buffered: Dict[str, bool] = {}
+        
+        # 記事詳細をまとめて取得
+        articles, missing_ids = self.db.get_articles_by_ids(article_ids, columns=["title", "content"])
+        for article_id in missing_ids:
+            print(f"[WARN] Article not found: {article_id}")
+            errors += 1
         
-        for article_id in article_ids:
+        for article in articles:
+            article_id = str(article["id"])
             try:
-                # 記事詳細を取得
-                article = self.db.get_article_by_id(article_id)
-                if not article:
-                    print(f"[WARN] Article not found: {article_id}")
-                    errors += 1
-                    continue
-                
                 # 記事本文から要約とラベルを生成
                 content = article.get("content", "") or article.get("title", "")
                 if not content.strip():
@@ -80,24 +131,36 @@ class SummarizeService:
                     errors += 1
                     continue
                 
+                # 近似重複記事が処理済みなら要約・ラベルを再利用
+                if self.reuse_duplicate_summary(article_id, article.get("content") or "", include_labeling):
+                    reused += 1
+                    processed += 1
+                    buffered[article_id] = True
+                    continue
+                
                 # 要約処理を実行
                 if include_labeling:
                     summary, labels = self.llm.generate_summary_and_labels(content, model_name=model_name)
-                    self.db.update_article_summary_and_labels(article_id, summary, labels)
+                    self.writer.write(article_id, summary=summary, labels=labels)
+                    self.duplicates.add(article_id, article.get("content") or "", summary, labels)
                 else:
                     summary = self.llm.generate_summary(content, model_name=model_name)
-                    self.db.update_article_summary(article_id, summary)
+                    self.writer.write(article_id, summary=summary)
                 
                 processed += 1
+                buffered[article_id] = False
                 print(f"[INFO] Processed article: {article.get('title', 'No title')[:50]}...")
                 
             except Exception as e:
                 print(f"[ERROR] Failed to process article {article_id}: {e}")
                 errors += 1
         
+        processed, reused, errors = self._flush_writes(buffered, processed, reused, errors)
+        
         return {
             "message": "Specific article summarization completed",
             "processed": processed,
+            "reused": reused,
             "errors": errors
         }
     
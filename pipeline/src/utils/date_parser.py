@@ -0,0 +1,171 @@
+"""
+公開日時パーサー
+フィードごとに日付形式（RFC 822 / ISO 8601）を最初のエントリーで判定して記憶し、
+高速な標準ライブラリのパスで解析する。dateutil は判定できない形式のフォールバックのみに使う。
+解析結果はすべて PIPELINE_TIMEZONE のタイムゾーン付き日時に正規化する
+"""
+import calendar
+import os
+import re
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import parser as dateutil_parser
+
+FORMAT_RFC822 = "rfc822"
+FORMAT_ISO8601 = "iso8601"
+FORMAT_FUZZY = "fuzzy"
+
+RFC822_PATTERN = re.compile(r'^\s*(?:[A-Za-z]{3},?\s+)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s')
+ISO8601_PATTERN = re.compile(r'^\s*\d{4}-\d{2}-\d{2}')
+# RFC 2822 の "-0000" はUTC（送信側のローカル時刻が不明）を表す
+RFC822_UNKNOWN_ZONE_PATTERN = re.compile(r'\s-0000\s*$')
+
+# 公開日時として参照するエントリーのフィールド（優先順）
+DATE_FIELDS = ("published", "updated", "pubDate")
+STRUCT_DATE_FIELDS = ("published_parsed", "updated_parsed")
+
+
+def _load_timezone() -> tzinfo:
+    name = os.environ.get("PIPELINE_TIMEZONE", "Asia/Tokyo")
+    try:
+        return ZoneInfo(name)
+    except ZoneInfoNotFoundError:
+        print(f"[WARN] Unknown timezone '{name}', falling back to UTC")
+        return timezone.utc
+
+
+# タイムゾーン指定のない日時の解釈と、解析結果の正規化に使うタイムゾーン
+LOCAL_TZ = _load_timezone()
+
+
+def normalize_timezone(dt: datetime) -> datetime:
+    """タイムゾーンなしの日時は LOCAL_TZ とみなし、LOCAL_TZ に変換"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=LOCAL_TZ)
+    return dt.astimezone(LOCAL_TZ)
+
+
+@lru_cache(maxsize=8192)
+def _parse_rfc822(value: str) -> Optional[datetime]:
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    # parsedate_to_datetime は "-0000" をタイムゾーンなしで返すため、LOCAL_TZ ではなくUTCとして扱う
+    if dt.tzinfo is None and RFC822_UNKNOWN_ZONE_PATTERN.search(value):
+        dt = dt.replace(tzinfo=timezone.utc)
+    return normalize_timezone(dt)
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso8601(value: str) -> Optional[datetime]:
+    text = value.strip()
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        return normalize_timezone(datetime.fromisoformat(text))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_fuzzy(value: str) -> Optional[datetime]:
+    try:
+        return normalize_timezone(dateutil_parser.parse(value))
+    except (ValueError, OverflowError):
+        return None
+
+
+PARSERS: Dict[str, Callable[[str], Optional[datetime]]] = {
+    FORMAT_RFC822: _parse_rfc822,
+    FORMAT_ISO8601: _parse_iso8601,
+    FORMAT_FUZZY: _parse_fuzzy,
+}
+
+
+def detect_format(value: str) -> str:
+    """日付文字列の形式を判定"""
+    if RFC822_PATTERN.match(value):
+        return FORMAT_RFC822
+    if ISO8601_PATTERN.match(value):
+        return FORMAT_ISO8601
+    return FORMAT_FUZZY
+
+
+def parse_datetime(value: str, fmt: Optional[str] = None) -> Tuple[Optional[datetime], Optional[str]]:
+    """
+    日付文字列を解析
+
+    Returns:
+        Tuple[Optional[datetime], Optional[str]]: (解析結果, 解析できた形式)
+    """
+    if not value:
+        return None, None
+    if fmt is not None:
+        dt = PARSERS[fmt](value)
+        if dt is not None:
+            return dt, fmt
+    detected = detect_format(value)
+    if detected != fmt:
+        dt = PARSERS[detected](value)
+        if dt is not None:
+            return dt, detected
+    if detected != FORMAT_FUZZY:
+        dt = _parse_fuzzy(value)
+        if dt is not None:
+            return dt, FORMAT_FUZZY
+    return None, None
+
+
+def day_range(start: Union[date, str], end: Union[date, str]) -> Tuple[datetime, datetime]:
+    """
+    開始日〜終了日（終了日を含む）を LOCAL_TZ の日時範囲 [start, end) に変換
+
+    文字列の場合は ISO 形式（YYYY-MM-DD）として解釈する。
+    """
+    if isinstance(start, str):
+        start = date.fromisoformat(start[:10])
+    if isinstance(end, str):
+        end = date.fromisoformat(end[:10])
+    return (
+        datetime.combine(start, time.min, tzinfo=LOCAL_TZ),
+        datetime.combine(end + timedelta(days=1), time.min, tzinfo=LOCAL_TZ),
+    )
+
+
+class FeedDateParser:
+    """フィードごとに日付形式を学習する公開日時パーサー"""
+
+    def __init__(self):
+        self._formats: Dict[str, str] = {}
+
+    def parse_entry(self, feed_key: str, entry: Any) -> Optional[datetime]:
+        """エントリーの公開日時を解析（解析できない場合はNone）"""
+        for field in DATE_FIELDS:
+            value = getattr(entry, field, None)
+            if not isinstance(value, str) or not value:
+                continue
+            dt, fmt = parse_datetime(value, self._formats.get(feed_key))
+            if dt is not None:
+                self._formats[feed_key] = fmt
+                return dt
+
+        # 文字列が解析できない場合は feedparser が解析済みの値（UTC）を使う
+        for field in STRUCT_DATE_FIELDS:
+            value = getattr(entry, field, None)
+            if value:
+                return datetime.fromtimestamp(calendar.timegm(value), tz=timezone.utc).astimezone(LOCAL_TZ)
+
+        return None
+
+    def get_formats(self) -> Dict[str, str]:
+        """フィード別に学習した日付形式を取得"""
+        return dict(self._formats)
+
+
+# グローバルインスタンス
+feed_date_parser = FeedDateParser()
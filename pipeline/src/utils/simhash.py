@@ -0,0 +1,73 @@
+"""
+SimHashユーティリティ
+文字シングルからSimHash指紋を計算し、ハミング距離とバンド分割で近似重複を判定する。
+日本語は単語区切りがないため、空白を除いた文字n-gramをシングルとする
+"""
+import re
+from array import array
+from collections import Counter
+from typing import List
+
+FINGERPRINT_BITS = 64
+FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+
+NON_WORD_PATTERN = re.compile(r'[\s\W_]+')
+
+# バイト値ごとの各ビットの立ち方（下位ビットから）
+_BYTE_BITS = [tuple((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+
+
+def normalize_text(text: str) -> str:
+    """大文字小文字・空白・記号の差を吸収した比較用テキスト"""
+    return NON_WORD_PATTERN.sub('', text.lower())
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """正規化テキストの文字n-gram集合"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def simhash(text: str, size: int = 5) -> int:
+    """
+    文字シングルのSimHash指紋（64bit）を計算
+
+    シングルのハッシュには組み込みhashを使う。プロセスごとにシードが変わるため、
+    指紋はメモリ上のインデックス内での比較にのみ使い、永続化しないこと。
+    """
+    grams = shingles(text, size)
+    if not grams:
+        return 0
+    # 全ハッシュを1つのバイト列にまとめ、バイト位置ごとの値の出現数からビットごとの票数を数える
+    hashes = array('Q', (hash(gram) & FINGERPRINT_MASK for gram in grams)).tobytes()
+    votes = [0] * FINGERPRINT_BITS
+    for position in range(FINGERPRINT_BITS // 8):
+        for value, count in Counter(hashes[position::8]).items():
+            bits = _BYTE_BITS[value]
+            for bit in range(8):
+                if bits[bit]:
+                    votes[position * 8 + bit] += count
+    threshold = len(grams) / 2
+    fingerprint = 0
+    for index, vote in enumerate(votes):
+        if vote > threshold:
+            fingerprint |= 1 << index
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """2つの指紋のハミング距離"""
+    return (a ^ b).bit_count()
+
+
+def bands(fingerprint: int, count: int) -> List[int]:
+    """
+    指紋を count 個のバンドに分割
+
+    ハミング距離が count - 1 以下の2指紋は、鳩の巣原理により少なくとも1つのバンドが完全一致する。
+    """
+    width = FINGERPRINT_BITS // count
+    mask = (1 << width) - 1
+    return [(fingerprint >> (index * width)) & mask for index in range(count)]
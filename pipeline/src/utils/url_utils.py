@@ -0,0 +1,31 @@
+"""
+URLユーティリティ
+重複判定・キャッシュキーに使うURL正規化
+"""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 記事の同一性に影響しないトラッキング用クエリパラメータ
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    URLを正規化
+
+    スキーム・ホストの小文字化、デフォルトポート・フラグメント・
+    トラッキング用パラメータの除去を行う。
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urlencode([
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ])
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
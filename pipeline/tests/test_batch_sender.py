@@ -0,0 +1,78 @@
+import asyncio
+
+from adapters.server_adapter import ServerAPIError
+from services.batch_sender import AdaptiveBatchSender
+from services.progress import ProgressReporter, EVENT_ERROR
+
+
+class RecordingProgress(ProgressReporter):
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, source=None, count=1, **data):
+        self.events.append((event, count, data))
+
+
+def _articles(count):
+    return [{"title": f"t{i}", "articleUrl": f"http://example.com/{i}"} for i in range(count)]
+
+
+def _send_all(sender, articles):
+    async def run():
+        buffer = list(articles)
+        while buffer:
+            await sender.submit(sender.take_batch(buffer))
+        await sender.drain()
+    asyncio.run(run())
+    return sender.result()
+
+
+def test_successful_batches_are_counted():
+    async def send(batch):
+        return {"insertedCount": len(batch) - 1, "skippedCount": 1, "invalidCount": 0}
+
+    sender = AdaptiveBatchSender(send_func=send)
+    sender.batch_size = 10
+    result = _send_all(sender, _articles(20))
+
+    assert result["success"] is True
+    assert result["insertedCount"] == 18
+    assert result["skippedCount"] == 2
+
+
+def test_always_failing_server_is_reported_as_error():
+    calls = []
+
+    async def send(batch):
+        calls.append(len(batch))
+        raise ServerAPIError(500, "internal error")
+
+    progress = RecordingProgress()
+    sender = AdaptiveBatchSender(send_func=send, progress=progress)
+    sender.batch_size = 20
+    sender.retry_delay = 0
+    result = _send_all(sender, _articles(20))
+
+    assert result["success"] is False
+    assert result["insertedCount"] == 0
+    assert result["invalidCount"] == 20
+    # 1件まで分割して再送する（2N-1 回）
+    assert len(calls) == 39
+    assert sum(1 for event, _, _ in progress.events if event == EVENT_ERROR) == 20
+
+
+def test_only_the_bad_article_fails_after_splitting():
+    async def send(batch):
+        if any(article["title"] == "t3" for article in batch):
+            raise ServerAPIError(400, "bad article")
+        return {"insertedCount": len(batch), "skippedCount": 0, "invalidCount": 0}
+
+    sender = AdaptiveBatchSender(send_func=send)
+    sender.batch_size = 8
+    sender.retry_delay = 0
+    result = _send_all(sender, _articles(8))
+
+    assert result["success"] is False
+    assert result["insertedCount"] == 7
+    assert result["invalidCount"] == 1
+    assert len(sender.errors) == 1
@@ -0,0 +1,70 @@
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from utils.date_parser import (
+    FORMAT_ISO8601,
+    FORMAT_RFC822,
+    LOCAL_TZ,
+    FeedDateParser,
+    day_range,
+    parse_datetime,
+)
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_rfc822_minus_zero_is_utc():
+    # "-0000" はタイムゾーンなしではなくUTCとして扱う
+    dt, fmt = parse_datetime("Fri, 16 Oct 2026 10:00:00 -0000")
+    assert fmt == FORMAT_RFC822
+    assert dt == _utc(2026, 10, 16, 10, 0)
+    assert dt.tzinfo is LOCAL_TZ
+
+
+def test_rfc822_explicit_offsets():
+    assert parse_datetime("Fri, 16 Oct 2026 10:00:00 +0000")[0] == _utc(2026, 10, 16, 10, 0)
+    assert parse_datetime("Fri, 16 Oct 2026 10:00:00 GMT")[0] == _utc(2026, 10, 16, 10, 0)
+    assert parse_datetime("Fri, 16 Oct 2026 19:00:00 +0900")[0] == _utc(2026, 10, 16, 10, 0)
+
+
+def test_rfc822_without_zone_is_local():
+    dt, _ = parse_datetime("Fri, 16 Oct 2026 10:00:00")
+    assert dt == datetime(2026, 10, 16, 10, 0, tzinfo=LOCAL_TZ)
+
+
+def test_iso8601_zulu_and_offset():
+    dt, fmt = parse_datetime("2026-10-16T10:00:00Z")
+    assert fmt == FORMAT_ISO8601
+    assert dt == _utc(2026, 10, 16, 10, 0)
+    assert parse_datetime("2026-10-16T19:00:00+09:00")[0] == _utc(2026, 10, 16, 10, 0)
+
+
+def test_unparseable_value():
+    assert parse_datetime("not a date") == (None, None)
+    assert parse_datetime("") == (None, None)
+
+
+def test_parse_entry_learns_format_per_feed():
+    parser = FeedDateParser()
+    entry = SimpleNamespace(published="Fri, 16 Oct 2026 10:00:00 -0000")
+    assert parser.parse_entry("feed-a", entry) == _utc(2026, 10, 16, 10, 0)
+    assert parser.get_formats() == {"feed-a": FORMAT_RFC822}
+
+    # 学習済みの形式で解析できない場合は判定し直す
+    entry = SimpleNamespace(published=None, updated="2026-10-16T10:00:00Z")
+    assert parser.parse_entry("feed-a", entry) == _utc(2026, 10, 16, 10, 0)
+    assert parser.get_formats() == {"feed-a": FORMAT_ISO8601}
+
+
+def test_parse_entry_falls_back_to_struct_time():
+    parser = FeedDateParser()
+    entry = SimpleNamespace(published="???", published_parsed=(2026, 10, 16, 10, 0, 0, 4, 289, 0))
+    assert parser.parse_entry("feed-b", entry) == _utc(2026, 10, 16, 10, 0)
+
+
+def test_day_range_includes_end_date():
+    start, end = day_range("2026-10-16", date(2026, 10, 17))
+    assert start == datetime(2026, 10, 16, tzinfo=LOCAL_TZ)
+    assert end == datetime(2026, 10, 18, tzinfo=LOCAL_TZ)
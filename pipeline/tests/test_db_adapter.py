@@ -0,0 +1,46 @@
+import uuid
+
+import pytest
+
+from adapters.db_adapter import build_bulk_update, order_by_ids
+
+
+def _rows(*ids):
+    return [{"id": article_id, "title": f"title {article_id}"} for article_id in ids]
+
+
+def test_rows_follow_requested_order():
+    # DBは任意の順で返すため、指定IDの順に並べ直す
+    articles, missing = order_by_ids(["c", "a", "b"], _rows("a", "b", "c"))
+    assert [a["id"] for a in articles] == ["c", "a", "b"]
+    assert missing == []
+
+
+def test_missing_ids_are_reported_in_order():
+    articles, missing = order_by_ids(["x", "a", "y"], _rows("a"))
+    assert [a["id"] for a in articles] == ["a"]
+    assert missing == ["x", "y"]
+
+
+def test_duplicate_ids_are_collapsed():
+    articles, missing = order_by_ids(["a", "b", "a", "x", "x"], _rows("a", "b"))
+    assert [a["id"] for a in articles] == ["a", "b"]
+    assert missing == ["x"]
+
+
+def test_ids_are_compared_as_strings():
+    article_id = uuid.uuid4()
+    articles, missing = order_by_ids([str(article_id), 1], _rows(article_id))
+    assert articles == _rows(article_id)
+    assert missing == ["1"]
+
+
+def test_bulk_update_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        build_bulk_update(["id; DROP TABLE"], 1)
+
+
+def test_bulk_update_has_one_values_row_per_article():
+    sql = build_bulk_update(["summary"], 3)
+    assert sql.count("(%s::text, %s::text)") == 3
+    assert '"summary" = v."summary"' in sql
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+from services.feed_reader import FeedReader, iter_xml_entries
+
+FEED_URL = "http://example.com/feed.xml"
+
+
+def _rss(days, encoding="utf-8", title="title"):
+    items = "".join(
+        f"<item><title>{title} {day}</title><link>http://example.com/{day}</link>"
+        f"<pubDate>{day:02d} Oct 2026 10:00:00 +0000</pubDate></item>"
+        for day in days
+    )
+    xml = f'<?xml version="1.0" encoding="{encoding}"?><rss version="2.0"><channel>{items}</channel></rss>'
+    return xml.encode(encoding)
+
+
+def _since(day):
+    return datetime(2026, 10, day, tzinfo=timezone.utc)
+
+
+def test_first_read_learns_newest_first_and_reads_everything():
+    reader = FeedReader()
+    entries = reader.read(FEED_URL, _rss([16, 15, 14, 13]), since=_since(15))
+    assert [e.link for e in entries] == [f"http://example.com/{day}" for day in (16, 15, 14, 13)]
+    assert reader.is_newest_first(FEED_URL) is True
+
+
+def test_newest_first_feed_stops_at_first_older_entry():
+    reader = FeedReader()
+    reader.read(FEED_URL, _rss([16, 15, 14, 13]))
+    entries = reader.read(FEED_URL, _rss([17, 16, 15, 14, 13]), since=_since(15))
+    # 開始日時より古い最初のエントリーで打ち切る（そのエントリーまでは返す）
+    assert [e.link for e in entries] == [f"http://example.com/{day}" for day in (17, 16, 15, 14)]
+    assert reader.is_newest_first(FEED_URL) is True
+
+
+def test_unordered_feed_is_read_to_the_end():
+    reader = FeedReader()
+    reader.read(FEED_URL, _rss([14, 16, 13, 15]))
+    assert reader.is_newest_first(FEED_URL) is False
+    entries = reader.read(FEED_URL, _rss([14, 16, 13, 15]), since=_since(15))
+    assert len(entries) == 4
+
+
+def test_order_change_disables_early_stop():
+    reader = FeedReader()
+    reader.read(FEED_URL, _rss([16, 15, 14]))
+    # 並び順が崩れたフィードは打ち切らず、以降も新しい順として扱わない
+    entries = reader.read(FEED_URL, _rss([16, 17, 14, 13]), since=_since(15))
+    assert len(entries) == 4
+    assert reader.is_newest_first(FEED_URL) is False
+
+
+def test_without_since_nothing_is_skipped():
+    reader = FeedReader()
+    reader.read(FEED_URL, _rss([16, 15, 14]))
+    assert len(reader.read(FEED_URL, _rss([16, 15, 14]))) == 3
+
+
+def test_shift_jis_feed_is_decoded():
+    entries = list(iter_xml_entries(_rss([16], encoding="shift_jis", title="ニュース")))
+    assert entries[0].title == "ニュース 16"
@@ -0,0 +1,61 @@
+import random
+
+from utils.simhash import FINGERPRINT_BITS, bands, hamming_distance, normalize_text, shingles, simhash
+
+ARTICLE = (
+    "政府は16日、来年度の予算案について閣議決定した。一般会計の総額は過去最大となり、"
+    "社会保障費と防衛費の増加が主な要因となっている。財源の確保が今後の課題だ。"
+    "与党内からは歳出の抑制を求める声も上がっており、国会での審議は難航が予想される。"
+    "野党は予算の組み替えを求める方針で、年明けの通常国会で論戦が本格化する見通しだ。"
+)
+UNRELATED = (
+    "新型の電気自動車が発表され、航続距離は従来モデルより大幅に伸びた。価格は据え置きとなる見込み。"
+    "同社は来年春から国内で販売を始め、海外市場への展開も検討している。充電設備の整備が普及の鍵となる。"
+)
+
+
+def _flip(fingerprint, positions):
+    for position in positions:
+        fingerprint ^= 1 << position
+    return fingerprint
+
+
+def test_bands_split_all_bits():
+    fingerprint = 0x0123456789ABCDEF
+    parts = bands(fingerprint, 4)
+    assert parts == [0xCDEF, 0x89AB, 0x4567, 0x0123]
+    restored = sum(part << (index * 16) for index, part in enumerate(parts))
+    assert restored == fingerprint
+
+
+def test_fingerprints_within_band_count_share_a_band():
+    rng = random.Random(0)
+    for count in (4, 5, 8):
+        for _ in range(200):
+            fingerprint = rng.getrandbits(FINGERPRINT_BITS)
+            other = _flip(fingerprint, rng.sample(range(FINGERPRINT_BITS), count - 1))
+            assert hamming_distance(fingerprint, other) == count - 1
+            assert any(a == b for a, b in zip(bands(fingerprint, count), bands(other, count)))
+
+
+def test_differences_in_every_band_share_nothing():
+    # 各バンドに1ビットずつ差があれば一致するバンドはない（候補にならない）
+    fingerprint = 0
+    other = _flip(fingerprint, [0, 16, 32, 48])
+    assert not any(a == b for a, b in zip(bands(fingerprint, 4), bands(other, 4)))
+
+
+def test_normalize_and_shingles():
+    assert normalize_text("Hello, World！ ") == "helloworld"
+    assert shingles("abc", size=5) == {"abc"}
+    assert shingles("", size=5) == set()
+    assert shingles("a b c d e f", size=5) == {"abcde", "bcdef"}
+
+
+def test_near_duplicates_are_close():
+    # 指紋はハッシュのシードで変わるため、どのシードでも成り立つ余裕を持たせた閾値で比較する
+    edited = ARTICLE.replace("16日", "17日")
+    assert simhash(ARTICLE) == simhash(ARTICLE)
+    assert hamming_distance(simhash(ARTICLE), simhash(edited)) <= 16
+    assert hamming_distance(simhash(ARTICLE), simhash(UNRELATED)) > 16
+    assert simhash("") == 0